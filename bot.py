@@ -9,8 +9,10 @@ from aiogram import Bot, Dispatcher
 from aiogram.types import BotCommand, BotCommandScopeAllGroupChats, BotCommandScopeAllPrivateChats
 
 from database import Database
+from database.chat_registry import chat_registry
 from database.games import cleanup_stale_games
 from commands import router as commands_router
+from game import session_manager, snapshot_writer, timer_service
 from messages import msg_game_cancelled_inactivity
 
 
@@ -18,18 +20,21 @@ dp = Dispatcher()
 dp.include_router(commands_router)
 
 
-async def cleanup_stale_games_task(bot: Bot) -> None:
-    while True:
-        await asyncio.sleep(300)
-        try:
-            chat_ids = await cleanup_stale_games()
-            for chat_id in chat_ids:
-                try:
-                    await bot.send_message(chat_id, msg_game_cancelled_inactivity())
-                except Exception:
-                    pass
-        except Exception:
-            pass
+STALE_GAMES_CLEANUP_INTERVAL = 300
+
+
+async def cleanup_stale_games_job(bot: Bot) -> None:
+    try:
+        chat_ids = await cleanup_stale_games()
+        for chat_id in chat_ids:
+            try:
+                await bot.send_message(chat_id, msg_game_cancelled_inactivity())
+            except Exception:
+                pass
+    except Exception:
+        pass
+    finally:
+        timer_service.schedule(STALE_GAMES_CLEANUP_INTERVAL, lambda: cleanup_stale_games_job(bot), "stale_cleanup")
 
 
 async def main() -> None:
@@ -38,9 +43,13 @@ async def main() -> None:
         raise ValueError("TELEGRAM_BOT_TOKEN environment variable is not set")
 
     await Database.connect()
+    await chat_registry.start()
 
     bot = Bot(token=token)
 
+    # Resume games left running by the previous process
+    await session_manager.restore_all(bot)
+
     registration_commands = [
         BotCommand(command="register", description="Присоединиться к игре"),
         BotCommand(command="unregister", description="Выйти из игры"),
@@ -62,12 +71,12 @@ async def main() -> None:
     await bot.set_my_commands(registration_commands, scope=BotCommandScopeAllGroupChats())
     await bot.set_my_commands(private_commands, scope=BotCommandScopeAllPrivateChats())
 
-    cleanup_task = asyncio.create_task(cleanup_stale_games_task(bot))
+    timer_service.schedule(STALE_GAMES_CLEANUP_INTERVAL, lambda: cleanup_stale_games_job(bot), "stale_cleanup")
 
     try:
         await dp.start_polling(bot)
     finally:
-        cleanup_task.cancel()
+        await snapshot_writer.flush_all()
         await Database.disconnect()
 
 
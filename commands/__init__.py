@@ -7,7 +7,9 @@ from commands.events import router as events_router
 from commands.pause import router as pause_router
 from commands.answer import router as answer_router
 from commands.settings import router as settings_router
+from commands.pack_list import router as pack_list_router
 from commands.game_mode import router as game_mode_router
+from commands.db_stats import router as db_stats_router
 
 router = Router()
 router.include_router(register_router)
@@ -16,7 +18,9 @@ router.include_router(player_info_router)
 router.include_router(events_router)
 router.include_router(pause_router)
 router.include_router(settings_router)
+router.include_router(pack_list_router)
 router.include_router(game_mode_router)
+router.include_router(db_stats_router)
 
 # Должно идти в конце иначе перехватывает все элиасы
 router.include_router(answer_router)
@@ -1,21 +1,21 @@
-import asyncio
-
 from aiogram import Bot, Router, types, F
 from aiogram.filters import Command
 from aiogram.types import ReplyKeyboardRemove
 
 from database.players import get_player_by_telegram_id
-from database.games import bulk_update_player_scores, get_game_scores
+from database.games import ScoreDelta, apply_score_deltas, get_game_scores
 from database.player_rights import ensure_player_rights
-from game import session_manager, GameState, AnswerState
+from game import session_manager, timer_service, GameState, AnswerState, TimerHandle
 from game import answers as game_answers
 from game import dispute
+from game.reveal import question_key
+from outbox import outbox, Priority
 
 import messages.game_messages as gm
 
 router = Router()
 
-_waiting_for_answer: dict[tuple[int, int], asyncio.Task] = {}
+_waiting_for_answer: dict[tuple[int, int], TimerHandle] = {}
 
 
 async def is_spectator(chat_id: int, telegram_id: int) -> bool:
@@ -34,10 +34,12 @@ async def restore_question_message(bot: Bot, chat_id: int, session) -> None:
     question_text = session.current_question_data.get('question', '')
     
     try:
-        await bot.edit_message_text(
-            chat_id=chat_id,
-            message_id=session.current_question_message_id,
-            text=gm.msg_question(cost, theme_name, question_text),
+        await outbox.edit(
+            bot,
+            chat_id,
+            session.current_question_message_id,
+            gm.msg_question(cost, theme_name, question_text),
+            key=question_key(session.current_question_message_id),
             parse_mode="HTML"
         )
     except Exception:
@@ -73,14 +75,19 @@ async def answer_command(message: types.Message, bot: Bot) -> None:
     if not game_answers.start_player_answering(chat_id, user.id):
         return
     
+    if session.question_reveal:
+        session.question_reveal.cancel()
+    
     if session.current_question_message_id:
         try:
             cost = session.current_question_data.get('cost', 0) if session.current_question_data else 0
             form = session.current_question_data.get('form', '') if session.current_question_data else ''
-            await bot.edit_message_text(
-                chat_id=chat_id,
-                message_id=session.current_question_message_id,
-                text=gm.msg_question_hidden(cost, form),
+            await outbox.edit(
+                bot,
+                chat_id,
+                session.current_question_message_id,
+                gm.msg_question_hidden(cost, form),
+                key=question_key(session.current_question_message_id),
                 parse_mode="HTML",
                 reply_markup=None  # Remove the keyboard from the question
             )
@@ -92,9 +99,11 @@ async def answer_command(message: types.Message, bot: Bot) -> None:
     player_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username or "Игрок"
     
     try:
-        await message.answer(
+        await outbox.reply(
+            message,
             gm.msg_player_answering(player_name),
-            reply_markup=ReplyKeyboardRemove()
+            reply_markup=ReplyKeyboardRemove(),
+            priority=Priority.GAME
         )
     except Exception:
         # If we can't send the message, still proceed with the answer logic
@@ -103,12 +112,11 @@ async def answer_command(message: types.Message, bot: Bot) -> None:
     key = (chat_id, user.id)
     
     async def answer_timeout():
-        await asyncio.sleep(10)
         if game_answers.cancel_answering(chat_id):
             if session.answered_players is not None:
                 session.answered_players[user.id] = AnswerState.INCORRECT
             try:
-                await bot.send_message(chat_id, gm.msg_time_up(player_name))
+                await outbox.send(bot, chat_id, gm.msg_time_up(player_name), priority=Priority.GAME)
                 await restore_question_message(bot, chat_id, session)
             except Exception:
                 # If message send fails, continue anyway
@@ -119,7 +127,7 @@ async def answer_command(message: types.Message, bot: Bot) -> None:
     if key in _waiting_for_answer:
         _waiting_for_answer[key].cancel()
     
-    _waiting_for_answer[key] = asyncio.create_task(answer_timeout())
+    _waiting_for_answer[key] = timer_service.schedule(10, answer_timeout, "answer_timeout")
 
 
 @router.message(Command("yes"))
@@ -152,9 +160,9 @@ async def yes_command(message: types.Message) -> None:
         return
     
     player_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username or "Игрок"
-    await message.answer(gm.msg_answer_confirmed(player_name))
+    await outbox.reply(message, gm.msg_answer_confirmed(player_name), priority=Priority.CHATTER)
     
-    session.timer_extension = 5.0
+    session.set_timer_remaining(5.0)
 
 
 @router.message(Command("no"))
@@ -187,9 +195,9 @@ async def no_command(message: types.Message) -> None:
         return
     
     player_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username or "Игрок"
-    await message.answer(gm.msg_answer_confirmed(player_name))
+    await outbox.reply(message, gm.msg_answer_confirmed(player_name), priority=Priority.CHATTER)
     
-    session.timer_extension = 5.0
+    session.set_timer_remaining(5.0)
 
 
 @router.message(Command("accidentally"))
@@ -223,9 +231,9 @@ async def accidentally_command(message: types.Message) -> None:
         return
     
     player_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username or "Игрок"
-    await message.answer(gm.msg_answer_confirmed(player_name))
+    await outbox.reply(message, gm.msg_answer_confirmed(player_name), priority=Priority.CHATTER)
     
-    session.timer_extension = 5.0
+    session.set_timer_remaining(5.0)
 
 
 @router.message(Command("dispute"))
@@ -252,18 +260,18 @@ async def dispute_command(message: types.Message, bot: Bot) -> None:
         return
     
     if session.dispute_poll_id is not None:
-        await message.answer("Уже идёт голосование по другому спору.")
+        await outbox.reply(message, "Уже идёт голосование по другому спору.", priority=Priority.CHATTER)
         return
 
     if not message.reply_to_message or not message.reply_to_message.from_user:
-        await message.answer("Ответьте на сообщение с ответом игрока, чтобы оспорить его.")
+        await outbox.reply(message, "Ответьте на сообщение с ответом игрока, чтобы оспорить его.", priority=Priority.CHATTER)
         return
     
     target = message.reply_to_message.from_user
     player_answer = message.reply_to_message.text or "???"
     
     if target.is_bot or not session.answered_players or target.id not in session.answered_players:
-        await message.answer("Этот игрок не отвечал на текущий вопрос.")
+        await outbox.reply(message, "Этот игрок не отвечал на текущий вопрос.", priority=Priority.CHATTER)
         return
     
     target_user_id = target.id
@@ -271,16 +279,20 @@ async def dispute_command(message: types.Message, bot: Bot) -> None:
     
     correct_answer = session.current_question_data.get('answer', '???') if session.current_question_data else '???'
     
-    poll_msg = await bot.send_poll(
-        chat_id=chat_id,
-        question=f"Засчитать ответ «{player_answer}»?\n(Правильный ответ: {correct_answer})",
-        options=["✅ Да, засчитать", "❌ Нет, не засчитывать"],
-        is_anonymous=False,
-        allows_multiple_answers=False
+    poll_msg = await outbox.submit(
+        chat_id,
+        lambda: bot.send_poll(
+            chat_id=chat_id,
+            question=f"Засчитать ответ «{player_answer}»?\n(Правильный ответ: {correct_answer})",
+            options=["✅ Да, засчитать", "❌ Нет, не засчитывать"],
+            is_anonymous=False,
+            allows_multiple_answers=False
+        ),
+        Priority.GAME
     )
     
     if not poll_msg.poll:
-        await message.answer("Ошибка создания голосования.")
+        await outbox.reply(message, "Ошибка создания голосования.", priority=Priority.CHATTER)
         return
     
     poll_id = poll_msg.poll.id
@@ -293,15 +305,14 @@ async def dispute_command(message: types.Message, bot: Bot) -> None:
         session.disputed_players = set()
     session.disputed_players.add(target_user_id)
     
-    session.timer_extension = 10.0
+    session.set_timer_remaining(10.0)
     
     async def auto_apply_dispute():
-        await asyncio.sleep(10)
         current_session = session_manager.get(chat_id)
         if current_session and current_session.dispute_poll_id == poll_id:
             await dispute.apply_dispute_result(current_session, bot)
     
-    asyncio.create_task(auto_apply_dispute())
+    timer_service.schedule(10, auto_apply_dispute, "dispute")
 
 
 @router.poll_answer()
@@ -355,9 +366,9 @@ async def apply_kick_result(session, bot: Bot) -> None:
             session.kicked_players = set()
         session.kicked_players.add(session.kick_player_id)
         
-        await bot.send_message(session.game_chat_id, "🚪 Игрок исключён из игры.")
+        await outbox.send(bot, session.game_chat_id, "🚪 Игрок исключён из игры.", priority=Priority.GAME)
     else:
-        await bot.send_message(session.game_chat_id, "Голосование не прошло. Игрок остаётся в игре.")
+        await outbox.send(bot, session.game_chat_id, "Голосование не прошло. Игрок остаётся в игре.", priority=Priority.GAME)
     
     if session.kick_poll_id:
         session_manager.unregister_poll(session.kick_poll_id)
@@ -394,20 +405,20 @@ async def correct_command(message: types.Message) -> None:
     try:
         amount = int(parts[1])
     except ValueError:
-        await message.answer("Укажите число. Например: /correct 10 или /correct -20")
+        await outbox.reply(message, "Укажите число. Например: /correct 10 или /correct -20", priority=Priority.CHATTER)
         return
     
     if amount < -100 or amount > 100:
-        await message.answer("Значение должно быть от -100 до 100.")
+        await outbox.reply(message, "Значение должно быть от -100 до 100.", priority=Priority.CHATTER)
         return
     
     if amount % 10 != 0:
-        await message.answer("Значение должно быть кратно 10.")
+        await outbox.reply(message, "Значение должно быть кратно 10.", priority=Priority.CHATTER)
         return
     
     player = await get_player_by_telegram_id(user.id)
     if not player or player['id'] not in session.players:
-        await message.answer("Вы не являетесь игроком этой игры.")
+        await outbox.reply(message, "Вы не являетесь игроком этой игры.", priority=Priority.CHATTER)
         return
     
     scores = await get_game_scores(chat_id)
@@ -425,14 +436,14 @@ async def correct_command(message: types.Message) -> None:
     if amount == 0:
         return
     
-    await bulk_update_player_scores(chat_id, {player['id']: amount})
+    await apply_score_deltas(chat_id, {player['id']: ScoreDelta(score=amount, abs_score=amount)})
     
     if session.player_abs_scores is not None:
         session.player_abs_scores[player['id']] = session.player_abs_scores.get(player['id'], 0) + amount
     
     player_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username or "Игрок"
     sign = "+" if amount >= 0 else ""
-    await message.answer(f"✏️ Счёт игрока {player_name} изменён на {sign}{amount}")
+    await outbox.reply(message, f"✏️ Счёт игрока {player_name} изменён на {sign}{amount}", priority=Priority.CHATTER)
 
 
 @router.message(F.text & ~F.text.startswith("/"))
@@ -480,8 +491,8 @@ async def handle_answer_text(message: types.Message, bot: Bot) -> None:
     )
     
     if is_correct:
-        await message.answer(gm.msg_correct_answer(player_name))
+        await outbox.reply(message, gm.msg_correct_answer(player_name), priority=Priority.GAME)
     else:
-        await message.answer(gm.msg_incorrect_answer(player_name), reply_markup=answer_keyboard)
+        await outbox.reply(message, gm.msg_incorrect_answer(player_name), reply_markup=answer_keyboard, priority=Priority.GAME)
     
     await restore_question_message(bot, chat_id, session)
@@ -1,25 +1,22 @@
 from aiogram import types
 
-from database.players import upsert_player
-from database.statistics import create_statistics
-from database.player_rights import ensure_player_rights
-from database import games
+from database.players import ensure_player
+from database import Database, games
 from messages import build_game_info_message
 
 
 async def ensure_player_exists(user: types.User) -> dict:
-    player = await upsert_player(user.id, user.username, user.first_name, user.last_name)
-    await create_statistics(player['id'])
-    await ensure_player_rights(user.id)
-    return player
+    return await ensure_player(user.id, user.username, user.first_name, user.last_name)
 
 
 async def send_game_info(message: types.Message, chat_id: int) -> None:
-    game_info = await games.get_game_info(chat_id)
+    async with Database.session():
+        game_info = await games.get_game_info(chat_id)
+        players = await games.get_players_with_stats(game_info['players']) if game_info else []
+    
     if not game_info:
         await message.answer("Ошибка получения информации об игре.")
         return
-    players = await games.get_players_with_stats(game_info['players'])
 
     await message.answer(
         build_game_info_message(
@@ -0,0 +1,66 @@
+from aiogram import Router, types
+from aiogram.filters import Command
+
+from database import Database
+from database.player_rights import ensure_player_rights
+from database.packs import pack_cache_stats
+from database.players import identity_cache_stats
+from game import timer_service
+from outbox import outbox
+
+router = Router()
+
+
+@router.message(Command("db_stats"))
+async def db_stats_command(message: types.Message) -> None:
+    user = message.from_user
+    if not user:
+        return
+    
+    rights = await ensure_player_rights(user.id)
+    if not rights or not rights['can_abort_all']:
+        return
+    
+    pool = Database.pool_stats()
+    lines = [
+        "🗄 <b>Пул соединений:</b>",
+        f"Размер: {pool.get('size', 0)} (мин {pool.get('min_size', 0)}, макс {pool.get('max_size', 0)})",
+        f"Занято: {pool['in_use']}, свободно: {pool.get('idle', 0)}",
+        f"В очереди: {pool['waiting']} (максимум {pool['max_waiting']})",
+        f"Ожидание: в среднем {pool['avg_wait_ms']:.1f} мс, максимум {pool['max_wait_ms']:.1f} мс",
+        f"Всего захватов: {pool['acquires']}",
+    ]
+    
+    by_telegram_id, by_player_id = identity_cache_stats()
+    lines += [
+        "",
+        "👤 <b>Кэш игроков:</b>",
+        f"По telegram_id: {by_telegram_id.size} записей, попаданий: {by_telegram_id.hit_rate:.0%} "
+        f"({by_telegram_id.hits}/{by_telegram_id.hits + by_telegram_id.misses})",
+        f"По id игрока: {by_player_id.size} записей, попаданий: {by_player_id.hit_rate:.0%} "
+        f"({by_player_id.hits}/{by_player_id.hits + by_player_id.misses})",
+    ]
+    
+    pack_cache, pack_cache_bytes = pack_cache_stats()
+    lines += [
+        "",
+        "📦 <b>Кэш паков:</b>",
+        f"Паков: {pack_cache.size}, {pack_cache_bytes / 1024 / 1024:.1f} МБ, "
+        f"попаданий: {pack_cache.hit_rate:.0%}, вытеснено: {pack_cache.evictions}",
+    ]
+    
+    timers = timer_service.pending_counts()
+    lines += [
+        "",
+        f"⏱ <b>Таймеры:</b> {sum(timers.values())}",
+    ]
+    lines += [f"{kind}: {count}" for kind, count in sorted(timers.items())]
+    
+    queued = outbox.pending_counts()
+    lines += [
+        "",
+        f"📤 <b>Очередь отправки:</b> {sum(queued.values())}",
+        ", ".join(f"{name}: {count}" for name, count in queued.items()),
+    ]
+    
+    await message.answer("\n".join(lines), parse_mode="HTML")
@@ -6,6 +6,7 @@ from commands import common
 from database import players, games, game_chats, packs
 from game import session_manager, GameStatus
 from messages import msg_all_players_joined
+from outbox import outbox, Priority
 
 router = Router()
 
@@ -56,17 +57,10 @@ async def on_player_joined(event: ChatMemberUpdated, bot: Bot) -> None:
         if session:
             remaining_themes = session.pack_themes[session.current_theme_idx:]
             
-            pack = await packs.get_pack_by_short_name(game['pack_short_name'])
+            pack = await packs.get_pack_info(game['pack_short_name'])
             if pack:
-                histories = await packs.get_player_pack_histories([db_player['id']])
-                player_played_themes: set[int] = set()
-                
-                for h in histories:
-                    if str(h['pack_id']) == str(pack['id']):
-                        player_played_themes = packs.parse_themes_played(h['themes_played'])
-                        break
-                
-                has_played_remaining = any(t in player_played_themes for t in remaining_themes)
+                player_played_mask = await packs.get_played_themes_mask(db_player['id'], pack['id'])
+                has_played_remaining = bool(player_played_mask & packs.themes_to_mask(remaining_themes))
                 
                 if has_played_remaining:
                     await games.add_spectator_to_game(game['chat_id'], db_player['id'])
@@ -101,7 +95,7 @@ async def on_player_joined(event: ChatMemberUpdated, bot: Bot) -> None:
     
     if joined_count == len(game['players']):
         await games.update_game_status(game['chat_id'], GameStatus.RUNNING)
-        await bot.send_message(chat_id, msg_all_players_joined())
+        await outbox.send(bot, chat_id, msg_all_players_joined(), priority=Priority.GAME)
         
         origin_chat_id = game.get('origin_chat_id') or game['chat_id']
         await session_manager.start(chat_id, origin_chat_id, bot)
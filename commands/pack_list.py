@@ -0,0 +1,100 @@
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from aiogram import Router, types, F
+from aiogram.filters import Command
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+import messages
+from database import packs
+from database.cache import TTLCache
+from middlewares import require_allowed_chat, require_not_game_chat
+
+router = Router()
+
+PAGE_SIZE = 15
+
+
+class PackListPage(CallbackData, prefix="packs"):
+    page: int
+
+
+@dataclass
+class PackListState:
+    query: str | None
+    player_ids: list[UUID]
+    # cursors[i] is the short_name page i starts after
+    cursors: list[str] = field(default_factory=lambda: [''])
+
+
+# Pagination state per sent list, keyed by (chat_id, message_id). Callback
+# data is limited to 64 bytes, too little for a query plus a cursor.
+_lists: TTLCache[tuple[int, int], PackListState] = TTLCache(1000, 3600)
+
+
+async def _render_page(state: PackListState, page: int) -> tuple[str, InlineKeyboardMarkup | None]:
+    # One extra row tells whether there is a next page
+    rows = await packs.search_packs(state.query, state.cursors[page], PAGE_SIZE + 1)
+    has_next = len(rows) > PAGE_SIZE
+    rows = rows[:PAGE_SIZE]
+    if has_next and len(state.cursors) == page + 1:
+        state.cursors.append(rows[-1]['short_name'])
+    
+    fresh_themes = None
+    if state.player_ids:
+        available = await packs.get_available_packs_for_players(state.player_ids, 0)
+        fresh_themes = {p.short_name: p.available_themes_count for p in available}
+    
+    text = messages.build_pack_list_message(rows, state.query, page, fresh_themes)
+    
+    buttons = []
+    if page > 0:
+        buttons.append(InlineKeyboardButton(text="◀️ Назад", callback_data=PackListPage(page=page - 1).pack()))
+    if has_next:
+        buttons.append(InlineKeyboardButton(text="Вперёд ▶️", callback_data=PackListPage(page=page + 1).pack()))
+    markup = InlineKeyboardMarkup(inline_keyboard=[buttons]) if buttons else None
+    
+    return text, markup
+
+
+async def send_pack_list(message: types.Message, query: str | None, player_ids: list[UUID] | None = None) -> None:
+    """Send the first page of the pack catalog, optionally filtered by query.
+    
+    With player_ids, each pack also shows how many of its themes none of them played.
+    """
+    state = PackListState(query=query, player_ids=player_ids or [])
+    text, markup = await _render_page(state, 0)
+    sent = await message.answer(text, parse_mode="HTML", reply_markup=markup)
+    if markup:
+        _lists.set((sent.chat.id, sent.message_id), state)
+
+
+@router.message(Command("pack_list"))
+@router.message(F.text.lower() == "паки")
+@require_not_game_chat
+@require_allowed_chat
+async def pack_list_command(message: types.Message) -> None:
+    args = message.text.split(maxsplit=1) if message.text else []
+    query = args[1].strip() if len(args) > 1 else None
+    await send_pack_list(message, query)
+
+
+@router.callback_query(PackListPage.filter())
+async def pack_list_page_callback(callback: types.CallbackQuery, callback_data: PackListPage) -> None:
+    message = callback.message
+    if not isinstance(message, types.Message):
+        await callback.answer()
+        return
+    
+    state = _lists.get((message.chat.id, message.message_id))
+    if state is None or not 0 <= callback_data.page < len(state.cursors):
+        await callback.answer("Список устарел, запросите его заново.")
+        return
+    
+    text, markup = await _render_page(state, callback_data.page)
+    try:
+        await message.edit_text(text, parse_mode="HTML", reply_markup=markup)
+    except Exception:
+        pass
+    await callback.answer()
@@ -2,7 +2,7 @@ from aiogram import Router, types, F
 from aiogram.filters import Command
 
 from commands import common
-from database import games, game_chats
+from database import Database, games, game_chats
 from game import GameStatus
 from middlewares import require_allowed_chat, require_not_game_chat
 
@@ -20,26 +20,29 @@ async def register(message: types.Message) -> None:
         return
     chat_id = message.chat.id
 
-    if await game_chats.get_game_by_game_chat(chat_id):
-        return
+    async with Database.session(transaction=True):
+        if await game_chats.is_game_chat(chat_id):
+            return
 
-    db_player = await common.ensure_player_exists(user)
+        db_player = await common.ensure_player_exists(user)
 
-    game = await games.get_game_by_chat_id(chat_id)
-    if not game:
-        await games.create_game(chat_id)
         game = await games.get_game_by_chat_id(chat_id)
+        if not game:
+            await games.create_game(chat_id)
+            game = await games.get_game_by_chat_id(chat_id)
+        
+        if game:
+            if game['status'] != GameStatus.REGISTERED.value:
+                return
+
+            if not db_player['id'] in game['players']:
+                await games.add_player_to_game(chat_id, db_player['id'])
     
+    # Replies go out after the session, so no connection is held during them
     if not game:
         await message.answer("Ошибка создания игры.")
         return
     
-    if game['status'] != GameStatus.REGISTERED.value:
-        return
-
-    if not db_player['id'] in game['players']:
-        await games.add_player_to_game(chat_id, db_player['id'])
-    
     await common.send_game_info(message, chat_id)
 
 
@@ -54,15 +57,16 @@ async def unregister(message: types.Message) -> None:
         return
     chat_id = message.chat.id
 
-    db_player = await common.ensure_player_exists(user)
+    async with Database.session(transaction=True):
+        db_player = await common.ensure_player_exists(user)
 
-    game = await games.get_game_by_chat_id(chat_id)
-    if not game or db_player['id'] not in game['players']:
-        return
-    
-    if game['status'] != GameStatus.REGISTERED.value:
-        return
+        game = await games.get_game_by_chat_id(chat_id)
+        if not game or db_player['id'] not in game['players']:
+            return
+        
+        if game['status'] != GameStatus.REGISTERED.value:
+            return
 
-    await games.remove_player_from_game(chat_id, db_player['id'])
+        await games.remove_player_from_game(chat_id, db_player['id'])
 
     await common.send_game_info(message, chat_id)
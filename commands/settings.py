@@ -2,6 +2,7 @@ from aiogram import Bot, Router, types, F
 from aiogram.filters import Command
 
 from commands.common import send_game_info
+from commands.pack_list import send_pack_list
 from database import games, game_chats, packs
 from database.players import get_player_by_telegram_id
 from database.player_rights import ensure_player_rights
@@ -81,18 +82,14 @@ async def pack_command(message: types.Message) -> None:
     
     args = message.text.split(maxsplit=1) if message.text else []
     if len(args) < 2:
-        all_packs = await packs.get_all_packs()
-        if not all_packs:
-            await message.answer("Нет доступных паков.")
-            return
-        
-        pack_list = "\n".join([f"• {p['short_name']} - {p['name']}" for p in all_packs])
         current = game['pack_short_name'] or "не выбран"
         await message.answer(
             f"Текущий пак: {current}\n\n"
-            f"Доступные паки:\n{pack_list}\n\n"
-            f"Использование: /pack <short_name>"
+            f"Использование: /pack <short_name>\n"
+            f"Поиск паков: /pack_list <запрос>"
         )
+        # Fresh theme counts for the registered group come from the in-memory index
+        await send_pack_list(message, None, game['players'])
         return
     
     pack_short_name = args[1].strip().lower()
@@ -103,34 +100,23 @@ async def pack_command(message: types.Message) -> None:
         await message.answer("🎲 Пак будет выбран случайно при старте игры.")
         return
     
-    pack = await packs.get_pack_by_short_name(pack_short_name)
+    pack = await packs.get_pack_info(pack_short_name)
     if not pack:
         await message.answer(f"Пак '{pack_short_name}' не найден.")
         return
     
     await games.set_pack(chat_id, pack_short_name)
-    await send_game_info(message, chat_id)
-
-
-@router.message(Command("pack_list"))
-@router.message(F.text.lower() == "паки")
-@require_not_game_chat
-@require_allowed_chat
-async def pack_list_command(message: types.Message) -> None:
-    all_packs = await packs.get_all_packs()
-    
-    if not all_packs:
-        await message.answer("Нет доступных паков.")
-        return
     
-    pack_lines = []
-    for p in all_packs:
-        pack_lines.append(f"<code>{p['short_name']}</code> — {p['name']} ({p['number_of_themes']} тем)")
+    if game['players']:
+        available = await packs.get_available_packs_for_players(game['players'], 0)
+        fresh_count = next((p.available_themes_count for p in available if p.id == pack['id']), 0)
+        if fresh_count < game['number_of_themes']:
+            await message.answer(
+                f"⚠️ Для зарегистрированных игроков в паке осталось новых тем: {fresh_count}, "
+                f"а нужно {game['number_of_themes']}."
+            )
     
-    await message.answer(
-        "📦 <b>Доступные паки:</b>\n\n" + "\n".join(pack_lines),
-        parse_mode="HTML"
-    )
+    await send_game_info(message, chat_id)
 
 
 @router.message(Command("abort"))
@@ -47,7 +47,7 @@ async def start_game(message: types.Message, bot: Bot) -> None:
     # Check if a pack was pre-selected
     if game['pack_short_name']:
         # Try to use the pre-selected pack
-        selected_pack_data = await packs.get_pack_by_short_name(game['pack_short_name'])
+        selected_pack_data = await packs.get_pack_info(game['pack_short_name'])
         if not selected_pack_data:
             await message.answer(
                 f"❌ Пак '{game['pack_short_name']}' не найден.\n"
@@ -0,0 +1,143 @@
+import asyncio
+import json
+from uuid import UUID
+
+from database.connection import Database
+
+CHANNEL = "chat_registry"
+
+# Backoff between attempts to re-listen and reload after losing sync
+_RESYNC_MIN_DELAY = 1.0
+_RESYNC_MAX_DELAY = 60.0
+
+
+class ChatRegistry:
+    """In-memory copy of allowed_chat and game_chat for O(1) chat classification.
+    
+    Loaded at startup, updated by the database helpers that write these tables
+    and by NOTIFY events for changes made outside the bot. Until it is loaded
+    (or while it resyncs after the listener connection is lost or a bad
+    notification) lookups return None and callers fall back to querying
+    Postgres.
+    """
+
+    def __init__(self) -> None:
+        self._loaded = False
+        self._allowed: dict[int, bool] = {}
+        self._game_chats: dict[UUID, int] = {}
+        self._game_by_chat: dict[int, UUID | None] = {}
+        self._relisten = False
+        self._resync_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        # Listen before loading so no change slips in between
+        await Database.listen(CHANNEL, self._on_notify, on_lost=self._on_lost)
+        await self.load()
+
+    def _on_lost(self) -> None:
+        print("[CHAT REGISTRY] Listener connection lost, reconnecting")
+        self._resync(relisten=True)
+
+    def _resync(self, relisten: bool) -> None:
+        """Fall back to database lookups until the registry is listening and reloaded again."""
+        self.invalidate()
+        self._relisten = self._relisten or relisten
+        if self._resync_task is None or self._resync_task.done():
+            self._resync_task = asyncio.get_running_loop().create_task(self._resync_loop())
+
+    async def _resync_loop(self) -> None:
+        delay = _RESYNC_MIN_DELAY
+        while True:
+            try:
+                if self._relisten:
+                    await Database.listen(CHANNEL, self._on_notify, on_lost=self._on_lost)
+                    self._relisten = False
+                await self.load()
+            except Exception as e:
+                print(f"[CHAT REGISTRY] Resync failed, retrying in {delay:.0f}s: {e}")
+                self._loaded = False
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _RESYNC_MAX_DELAY)
+                continue
+            # Lost again while reloading: go round once more
+            if self._relisten:
+                continue
+            print("[CHAT REGISTRY] Resynced")
+            return
+
+    async def load(self) -> None:
+        async with Database.acquire() as conn:
+            allowed_rows = await Database.fetch(conn, "allowed_chat/get_all_chats")
+            game_chat_rows = await Database.fetch(conn, "game_chats/get_all_game_chats")
+        
+        self._allowed = {row['chat_id']: row['is_allowed'] for row in allowed_rows}
+        self._game_chats = {}
+        self._game_by_chat = {}
+        for row in game_chat_rows:
+            self._set_game_chat(row['id'], row['chat_id'], row['game_id'])
+        self._loaded = True
+
+    def invalidate(self) -> None:
+        self._loaded = False
+
+    def is_allowed(self, chat_id: int) -> bool | None:
+        if not self._loaded:
+            return None
+        return self._allowed.get(chat_id)
+
+    def is_game_chat(self, chat_id: int) -> bool | None:
+        if not self._loaded:
+            return None
+        return self._game_by_chat.get(chat_id) is not None
+
+    def set_allowed(self, chat_id: int, is_allowed: bool) -> None:
+        self._allowed[chat_id] = is_allowed
+
+    def forget_allowed(self, chat_id: int) -> None:
+        self._allowed.pop(chat_id, None)
+
+    def assign_game(self, game_chat_id: UUID, game_id: UUID | None) -> None:
+        chat_id = self._game_chats.get(game_chat_id)
+        if chat_id is not None:
+            self._game_by_chat[chat_id] = game_id
+
+    def release_game(self, game_id: UUID) -> None:
+        for chat_id, assigned in self._game_by_chat.items():
+            if assigned == game_id:
+                self._game_by_chat[chat_id] = None
+
+    def release_all(self) -> None:
+        for chat_id in self._game_by_chat:
+            self._game_by_chat[chat_id] = None
+
+    def _set_game_chat(self, game_chat_id: UUID, chat_id: int, game_id: UUID | None) -> None:
+        self._game_chats[game_chat_id] = chat_id
+        self._game_by_chat[chat_id] = game_id
+
+    def _remove_game_chat(self, game_chat_id: UUID) -> None:
+        chat_id = self._game_chats.pop(game_chat_id, None)
+        if chat_id is not None and chat_id not in self._game_chats.values():
+            self._game_by_chat.pop(chat_id, None)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+            row = event['row']
+            if event['table'] == 'allowed_chat':
+                if event['op'] == 'DELETE':
+                    self.forget_allowed(row['chat_id'])
+                else:
+                    self.set_allowed(row['chat_id'], row['is_allowed'])
+            elif event['table'] == 'game_chat':
+                game_chat_id = UUID(row['id'])
+                if event['op'] == 'DELETE':
+                    self._remove_game_chat(game_chat_id)
+                else:
+                    game_id = UUID(row['game_id']) if row.get('game_id') else None
+                    self._set_game_chat(game_chat_id, row['chat_id'], game_id)
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"[CHAT REGISTRY] Bad notification payload, reloading: {e}")
+            self._resync(relisten=False)
+
+
+chat_registry = ChatRegistry()
@@ -1,39 +1,298 @@
+import asyncio
 import os
-from pathlib import Path
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable
 
 import asyncpg
+from asyncpg.prepared_stmt import PreparedStatement
+
+from database.pool import PoolConfig, PoolStats
+from database.statements import StatementRegistry, StatementStats
+
+
+@dataclass
+class _Session:
+    conn: asyncpg.Connection
+    owner: asyncio.Task | None
+    on_commit: list[Callable[[], None]] = field(default_factory=list)
+
+
+_current_session: ContextVar[_Session | None] = ContextVar("db_session", default=None)
 
 
 class Database:
     _pool: asyncpg.Pool | None = None
-    _sql_cache: dict[str, str] = {}
-    
+    _config: PoolConfig = PoolConfig()
+    _pool_stats: PoolStats = PoolStats()
+    _statements: StatementRegistry = StatementRegistry()
+    _listener: asyncpg.Connection | None = None
+    _listener_lost_callbacks: list[Callable[[], None]] = []
+
+    @staticmethod
+    def _connect_kwargs() -> dict[str, Any]:
+        return {
+            'host': os.getenv("DB_HOST", "localhost"),
+            'port': int(os.getenv("DB_PORT", 5432)),
+            'user': os.getenv("DB_USER", "postgres"),
+            'password': os.getenv("DB_PASSWORD", ""),
+            'database': os.getenv("DB_NAME", "svoyachello"),
+        }
+
     @classmethod
     async def connect(cls) -> None:
+        cls._statements.load()
+        cls._config = PoolConfig.from_env()
+        cls._pool_stats = PoolStats()
+        
         cls._pool = await asyncpg.create_pool(
-            host=os.getenv("DB_HOST", "localhost"),
-            port=int(os.getenv("DB_PORT", 5432)),
-            user=os.getenv("DB_USER", "postgres"),
-            password=os.getenv("DB_PASSWORD", ""),
-            database=os.getenv("DB_NAME", "svoyachello"),
+            **cls._connect_kwargs(),
+            min_size=cls._config.min_size,
+            max_size=cls._config.max_size,
+            max_inactive_connection_lifetime=cls._config.max_inactive_connection_lifetime,
+            statement_cache_size=cls._config.statement_cache_size,
+            command_timeout=cls._config.command_timeout,
+            server_settings=cls._config.server_settings or None,
+            init=cls._init_connection,
         )
-    
+
+    @classmethod
+    async def _init_connection(cls, conn: asyncpg.Connection) -> None:
+        # The registry holds the prepared statements itself; asyncpg's statement
+        # cache only serves queries run outside it
+        if cls._config.prepare_statements:
+            await cls._statements.prepare_all(conn)
+
     @classmethod
     async def disconnect(cls) -> None:
+        if cls._listener:
+            listener = cls._listener
+            cls._listener = None
+            await listener.close()
         if cls._pool:
             await cls._pool.close()
             cls._pool = None
-    
+
+    @classmethod
+    def _session_connection(cls) -> asyncpg.Connection | None:
+        session = _current_session.get()
+        # Tasks spawned inside a session inherit the context but must not
+        # share its connection: asyncpg allows one operation at a time.
+        if session is None or session.owner is not asyncio.current_task():
+            return None
+        return session.conn
+
+    @classmethod
+    @asynccontextmanager
+    async def acquire(cls) -> AsyncIterator[asyncpg.Connection]:
+        """Acquire a pool connection, recording wait time, in-use count and queue depth.
+        
+        Inside Database.session() the session's connection is returned instead.
+        """
+        session_conn = cls._session_connection()
+        if session_conn is not None:
+            yield session_conn
+            return
+        
+        pool = cls.get_pool()
+        stats = cls._pool_stats
+        
+        started = time.monotonic()
+        stats.start_wait()
+        acquired = False
+        try:
+            conn = await pool.acquire()
+            acquired = True
+        finally:
+            stats.end_wait(time.monotonic() - started, acquired)
+        
+        try:
+            yield conn
+        finally:
+            stats.release()
+            await pool.release(conn)
+
+    @classmethod
+    @asynccontextmanager
+    async def session(cls, transaction: bool = False) -> AsyncIterator[asyncpg.Connection]:
+        """Unit of work: every database helper called inside the block uses one connection.
+        
+        With transaction=True the block is atomic. Nested sessions reuse the
+        outer connection, and a nested transaction becomes a savepoint.
+        """
+        session_conn = cls._session_connection()
+        if session_conn is not None:
+            if transaction:
+                async with cls._transaction(_current_session.get()):
+                    yield session_conn
+            else:
+                yield session_conn
+            return
+        
+        async with cls.acquire() as conn:
+            session = _Session(conn=conn, owner=asyncio.current_task())
+            token = _current_session.set(session)
+            try:
+                if transaction:
+                    async with cls._transaction(session):
+                        yield conn
+                else:
+                    yield conn
+            finally:
+                _current_session.reset(token)
+
+    @classmethod
+    @asynccontextmanager
+    async def _transaction(cls, session: _Session) -> AsyncIterator[None]:
+        outermost = not session.conn.is_in_transaction()
+        mark = len(session.on_commit)
+        try:
+            async with session.conn.transaction():
+                yield
+        except BaseException:
+            # Rolled back (or back to the savepoint): forget what it registered
+            del session.on_commit[mark:]
+            raise
+        if outermost:
+            callbacks = session.on_commit[mark:]
+            del session.on_commit[mark:]
+            for callback in callbacks:
+                callback()
+
+    @classmethod
+    def after_commit(cls, callback: Callable[[], None]) -> None:
+        """Run callback once the session's transaction commits, or now outside a transaction.
+        
+        Callbacks registered in a transaction that rolls back are dropped.
+        """
+        session = _current_session.get()
+        if (
+            session is not None
+            and session.owner is asyncio.current_task()
+            and session.conn.is_in_transaction()
+        ):
+            session.on_commit.append(callback)
+        else:
+            callback()
+
+    @classmethod
+    def pool_stats(cls) -> dict[str, Any]:
+        stats = cls._pool_stats
+        result: dict[str, Any] = {
+            'acquires': stats.acquires,
+            'in_use': stats.in_use,
+            'waiting': stats.waiting,
+            'max_waiting': stats.max_waiting,
+            'avg_wait_ms': stats.avg_wait * 1000,
+            'max_wait_ms': stats.max_wait * 1000,
+        }
+        if cls._pool is not None:
+            result['size'] = cls._pool.get_size()
+            result['idle'] = cls._pool.get_idle_size()
+            result['min_size'] = cls._pool.get_min_size()
+            result['max_size'] = cls._pool.get_max_size()
+        return result
+
+    @classmethod
+    async def listen(
+        cls,
+        channel: str,
+        callback: Callable[[asyncpg.Connection, int, str, str], None],
+        on_lost: Callable[[], None] | None = None,
+    ) -> None:
+        """Subscribe to NOTIFY on a dedicated connection, outside the pool.
+        
+        on_lost is called if that connection terminates, since notifications
+        sent while disconnected are gone for good. Calling listen() again after
+        that opens a new connection.
+        """
+        if cls._listener is None:
+            listener = await asyncpg.connect(**cls._connect_kwargs())
+            listener.add_termination_listener(cls._on_listener_lost)
+            cls._listener = listener
+            cls._listener_lost_callbacks = []
+        await cls._listener.add_listener(channel, callback)
+        if on_lost is not None:
+            cls._listener_lost_callbacks.append(on_lost)
+
+    @classmethod
+    def _on_listener_lost(cls, conn: asyncpg.Connection) -> None:
+        # disconnect() clears _listener before closing, so this is a real loss
+        if cls._listener is not conn:
+            return
+        cls._listener = None
+        for on_lost in cls._listener_lost_callbacks:
+            on_lost()
+
     @classmethod
     def get_pool(cls) -> asyncpg.Pool:
         if cls._pool is None:
             raise RuntimeError("Database not connected. Call Database.connect() first.")
         return cls._pool
-    
+
     @classmethod
     def load_sql(cls, filename: str) -> str:
-        if filename not in cls._sql_cache:
-            sql_dir = Path(__file__).parent.parent / "sql"
-            sql_path = sql_dir / filename
-            cls._sql_cache[filename] = sql_path.read_text()
-        return cls._sql_cache[filename]
+        return cls._statements.get(filename.removesuffix(".sql"))
+
+    @classmethod
+    async def _run(
+        cls,
+        conn: asyncpg.Connection,
+        name: str,
+        prepared: Callable[[PreparedStatement], Awaitable[Any]],
+        plain: Callable[[str], Awaitable[Any]],
+    ) -> Any:
+        sql = cls._statements.get(name)
+        cls._statements.record_execute(name)
+        statement = cls._statements.prepared(conn, name)
+        if statement is None:
+            return await plain(sql)
+        try:
+            return await prepared(statement)
+        except asyncpg.InvalidCachedStatementError:
+            # asyncpg does not re-prepare statements held outside its cache.
+            # Inside a transaction the error has aborted it, so the statement
+            # is re-prepared on its next use instead.
+            if conn.is_in_transaction():
+                raise
+            statement = await cls._statements.reprepare(conn, name)
+            return await prepared(statement)
+
+    @classmethod
+    async def fetch(cls, conn: asyncpg.Connection, name: str, *args: Any) -> list[asyncpg.Record]:
+        return await cls._run(
+            conn, name,
+            lambda statement: statement.fetch(*args),
+            lambda sql: conn.fetch(sql, *args),
+        )
+
+    @classmethod
+    async def fetchrow(cls, conn: asyncpg.Connection, name: str, *args: Any) -> asyncpg.Record | None:
+        return await cls._run(
+            conn, name,
+            lambda statement: statement.fetchrow(*args),
+            lambda sql: conn.fetchrow(sql, *args),
+        )
+
+    @classmethod
+    async def fetchval(cls, conn: asyncpg.Connection, name: str, *args: Any) -> Any:
+        return await cls._run(
+            conn, name,
+            lambda statement: statement.fetchval(*args),
+            lambda sql: conn.fetchval(sql, *args),
+        )
+
+    @classmethod
+    async def execute(cls, conn: asyncpg.Connection, name: str, *args: Any) -> str:
+        async def run_prepared(statement: PreparedStatement) -> str:
+            await statement.fetch(*args)
+            return statement.get_statusmsg()
+        
+        return await cls._run(conn, name, run_prepared, lambda sql: conn.execute(sql, *args))
+
+    @classmethod
+    def statement_stats(cls) -> dict[str, StatementStats]:
+        """Per-statement prepare and execute counts since process start."""
+        return cls._statements.stats()
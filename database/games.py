@@ -1,4 +1,5 @@
 import json
+from dataclasses import dataclass
 from uuid import UUID
 
 from database.connection import Database
@@ -18,72 +19,56 @@ def _parse_jsonb(value) -> dict:
     return {}
 
 
+@dataclass
+class ScoreDelta:
+    score: int = 0
+    abs_score: int = 0
+    correct: int = 0
+    wrong: int = 0
+
+
 async def create_game(chat_id: int) -> UUID | None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/create_game.sql")
-    
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(sql, chat_id)
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "games/create_game", chat_id)
         return row['id'] if row else None
 
 
 async def get_game_by_chat_id(chat_id: int) -> dict | None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/get_game_by_chat_id.sql")
-    
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(sql, chat_id)
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "games/get_game_by_chat_id", chat_id)
         return dict(row) if row else None
 
 
 async def update_game_status(chat_id: int, status: GameStatus) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/update_game_status.sql")
-    
-    async with pool.acquire() as conn:
-        await conn.execute(sql, chat_id, status.value)
+    async with Database.acquire() as conn:
+        await Database.execute(conn, "games/update_game_status", chat_id, status.value)
 
 
 async def add_player_to_game(chat_id: int, player_id: UUID) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/add_player_to_game.sql")
-    
-    async with pool.acquire() as conn:
+    async with Database.acquire() as conn:
         async with conn.transaction():
-            await conn.execute(sql, chat_id, player_id)
+            await Database.execute(conn, "games/add_player_to_game", chat_id, player_id)
 
 
 async def add_spectator_to_game(chat_id: int, player_id: UUID) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/add_spectator_to_game.sql")
-    
-    async with pool.acquire() as conn:
-        await conn.execute(sql, chat_id, player_id)
+    async with Database.acquire() as conn:
+        await Database.execute(conn, "games/add_spectator_to_game", chat_id, player_id)
 
 
 async def remove_player_from_game(chat_id: int, player_id: UUID) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/remove_player_from_game.sql")
-    
-    async with pool.acquire() as conn:
+    async with Database.acquire() as conn:
         async with conn.transaction():
-            await conn.execute(sql, chat_id, player_id)
+            await Database.execute(conn, "games/remove_player_from_game", chat_id, player_id)
 
 
 async def delete_game(chat_id: int) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/delete_game.sql")
-    
-    async with pool.acquire() as conn:
-        await conn.execute(sql, chat_id)
+    async with Database.acquire() as conn:
+        await Database.execute(conn, "games/delete_game", chat_id)
 
 
 async def get_game_info(chat_id: int) -> dict | None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/get_game_info.sql")
-    
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(sql, chat_id)
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "games/get_game_info", chat_id)
         return dict(row) if row else None
 
 
@@ -91,70 +76,86 @@ async def get_players_with_stats(player_ids: list[UUID]) -> list[dict]:
     if not player_ids:
         return []
     
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/get_players_with_stats.sql")
-    
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(sql, player_ids)
+    async with Database.acquire() as conn:
+        rows = await Database.fetch(conn, "games/get_players_with_stats", player_ids)
         return [dict(row) for row in rows]
 
 
 async def cleanup_stale_games() -> list[int]:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/cleanup_stale_games.sql")
-    
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(sql)
+    async with Database.acquire() as conn:
+        rows = await Database.fetch(conn, "games/cleanup_stale_games")
         return [row['chat_id'] for row in rows]
 
 
-async def bulk_update_player_scores(chat_id: int, score_changes: dict[UUID, int]) -> None:
-    if not score_changes:
-        return
+async def get_running_games() -> list[dict]:
+    async with Database.acquire() as conn:
+        rows = await Database.fetch(conn, "games/get_running_games")
+        return [dict(row) for row in rows]
+
+
+async def apply_score_deltas(
+    chat_id: int,
+    deltas: dict[UUID, ScoreDelta],
+    position: tuple[int, int] | None = None,
+) -> dict[UUID, dict]:
+    """Increment per-player score rows in one statement and return the updated rows.
     
-    pool = Database.get_pool()
-    get_scores_sql = Database.load_sql("games/get_game_scores.sql")
-    update_sql = Database.load_sql("games/bulk_update_player_scores.sql")
+    With a position, current_position is moved there in the same transaction,
+    so a restore never continues from a question whose scores are committed.
+    """
+    if not deltas:
+        return {}
     
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(get_scores_sql, chat_id)
-        if not row:
-            return
-        
-        current_scores = _parse_jsonb(row['scores'])
-        
-        for player_id, points in score_changes.items():
-            player_key = str(player_id)
-            current = int(current_scores.get(player_key, 0))
-            current_scores[player_key] = current + points
-        
-        await conn.execute(update_sql, chat_id, json.dumps(current_scores))
+    # Fixed lock order keeps concurrent writers from deadlocking
+    player_ids = sorted(deltas, key=str)
+    
+    async with Database.session(transaction=position is not None) as conn:
+        rows = await Database.fetch(
+            conn,
+            "games/bulk_update_player_scores",
+            chat_id,
+            player_ids,
+            [deltas[pid].score for pid in player_ids],
+            [deltas[pid].abs_score for pid in player_ids],
+            [deltas[pid].correct for pid in player_ids],
+            [deltas[pid].wrong for pid in player_ids],
+        )
+        if position is not None:
+            theme, question = position
+            await Database.execute(conn, "games/set_current_position", chat_id, int(theme), int(question))
+        return {row['player_id']: dict(row) for row in rows}
+
+
+async def bulk_update_player_scores(chat_id: int, score_changes: dict[UUID, int]) -> dict[str, int]:
+    """Add score deltas in a single statement and return the new scores of the changed players."""
+    rows = await apply_score_deltas(
+        chat_id,
+        {player_id: ScoreDelta(score=points) for player_id, points in score_changes.items()}
+    )
+    return {str(player_id): row['score'] for player_id, row in rows.items()}
+
+
+async def get_game_player_scores(chat_id: int) -> dict[UUID, dict]:
+    """Get score, abs_score, correct and wrong counts for every player with a score row."""
+    async with Database.acquire() as conn:
+        rows = await Database.fetch(conn, "games/get_game_scores", chat_id)
+        return {row['player_id']: dict(row) for row in rows}
 
 
 async def get_game_scores(chat_id: int) -> dict:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/get_game_scores.sql")
-    
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(sql, chat_id)
-        return _parse_jsonb(row['scores']) if row else {}
+    rows = await get_game_player_scores(chat_id)
+    return {str(player_id): row['score'] for player_id, row in rows.items()}
 
 
 async def assign_pack_to_game(chat_id: int, pack_short_name: str, pack_themes: list[int]) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/assign_pack_to_game.sql")
-    
-    async with pool.acquire() as conn:
-        await conn.execute(sql, chat_id, pack_short_name, pack_themes)
+    async with Database.acquire() as conn:
+        await Database.execute(conn, "games/assign_pack_to_game", chat_id, pack_short_name, pack_themes)
 
 
 async def get_current_position(chat_id: int) -> dict:
     default = {'theme': 0, 'question': 0}
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/get_current_position.sql")
-    
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(sql, chat_id)
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "games/get_current_position", chat_id)
         if row and row['current_position']:
             pos = _parse_jsonb(row['current_position'])
             return {'theme': int(pos.get('theme', 0)), 'question': int(pos.get('question', 0))}
@@ -162,56 +163,40 @@ async def get_current_position(chat_id: int) -> dict:
 
 
 async def set_current_position(chat_id: int, theme: int, question: int) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/set_current_position.sql")
-    
-    async with pool.acquire() as conn:
-        await conn.execute(sql, chat_id, int(theme), int(question))
+    async with Database.acquire() as conn:
+        await Database.execute(conn, "games/set_current_position", chat_id, int(theme), int(question))
+
+
+async def set_session_snapshot(chat_id: int, snapshot: bytes) -> None:
+    async with Database.acquire() as conn:
+        await Database.execute(conn, "games/set_session_snapshot", chat_id, snapshot)
 
 
 async def set_number_of_themes(chat_id: int, number_of_themes: int) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/set_number_of_themes.sql")
-    
-    async with pool.acquire() as conn:
-        await conn.execute(sql, chat_id, number_of_themes)
+    async with Database.acquire() as conn:
+        await Database.execute(conn, "games/set_number_of_themes", chat_id, number_of_themes)
 
 
 async def set_pack(chat_id: int, pack_short_name: str | None) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/set_pack.sql")
-    
-    async with pool.acquire() as conn:
-        await conn.execute(sql, chat_id, pack_short_name)
+    async with Database.acquire() as conn:
+        await Database.execute(conn, "games/set_pack", chat_id, pack_short_name)
 
 
 async def set_game_chat_id(old_chat_id: int, new_chat_id: int) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/set_game_chat_id.sql")
-    
-    async with pool.acquire() as conn:
-        await conn.execute(sql, old_chat_id, new_chat_id)
+    async with Database.acquire() as conn:
+        await Database.execute(conn, "games/set_game_chat_id", old_chat_id, new_chat_id)
 
 
 async def delete_all_games() -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/delete_all_games.sql")
-    
-    async with pool.acquire() as conn:
-        await conn.execute(sql)
+    async with Database.acquire() as conn:
+        await Database.execute(conn, "games/delete_all_games")
 
 
 async def set_invite_link(chat_id: int, invite_link: str) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/set_invite_link.sql")
-    
-    async with pool.acquire() as conn:
-        await conn.execute(sql, chat_id, invite_link)
+    async with Database.acquire() as conn:
+        await Database.execute(conn, "games/set_invite_link", chat_id, invite_link)
 
 
 async def set_game_mode(chat_id: int, game_mode: str) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("games/set_game_mode.sql")
-    
-    async with pool.acquire() as conn:
-        await conn.execute(sql, chat_id, game_mode)
+    async with Database.acquire() as conn:
+        await Database.execute(conn, "games/set_game_mode", chat_id, game_mode)
@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Mapping
+from uuid import UUID
+
+from database.cache import CacheStats
+
+
+def freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class PackContentCache:
+    """Process-wide LRU of decoded pack parts, bounded by their encoded size.
+    
+    A part is a pack's meta (part None) or one of its themes (part = theme
+    index). Entries are keyed by (pack_id, version, part) and handed out as
+    shared read-only objects, so concurrent games on the same pack share
+    memory and a rewritten pack (new version) is never served stale.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[UUID, int, int | None], tuple[int, Any]] = OrderedDict()
+        self._versions: dict[UUID, int] = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, pack_id: UUID, version: int, part: int | None) -> Any | None:
+        key = (pack_id, version, part)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[1]
+
+    def put(self, pack_id: UUID, version: int, part: int | None, content: Any, size: int) -> Any:
+        frozen = freeze(content)
+        if size > self._max_bytes:
+            return frozen
+        
+        if self._versions.get(pack_id, version) != version:
+            self.invalidate(pack_id)
+        self._versions[pack_id] = version
+        
+        key = (pack_id, version, part)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[0]
+        self._entries[key] = (size, frozen)
+        self._bytes += size
+        while self._bytes > self._max_bytes and self._entries:
+            evicted_size, _ = self._entries.popitem(last=False)[1]
+            self._bytes -= evicted_size
+            self._evictions += 1
+        return frozen
+
+    def invalidate(self, pack_id: UUID) -> None:
+        self._versions.pop(pack_id, None)
+        for key in [key for key in self._entries if key[0] == pack_id]:
+            size, _ = self._entries.pop(key)
+            self._bytes -= size
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            size=len(self._entries),
+        )
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
@@ -1,9 +1,32 @@
 import json
+import os
+from types import MappingProxyType
 from uuid import UUID
-from typing import Any
+from typing import Any, Mapping
 from dataclasses import dataclass
 
+from database.cache import CacheStats, TTLCache
 from database.connection import Database
+from database.pack_cache import PackContentCache, freeze
+from database.played_themes import PlayedThemesIndex
+
+# Decoded pack contents are shared by every session playing the pack. The
+# bound is on the size of the stored JSON, a proxy for the decoded footprint.
+_PACK_CACHE_MAX_BYTES = int(os.getenv("PACK_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+_pack_contents = PackContentCache(_PACK_CACHE_MAX_BYTES)
+
+# The catalog only changes when a pack is added or rewritten (usually by
+# scripts/append_pack.py in another process), so a short TTL is enough.
+_PACK_CATALOG_TTL = float(os.getenv("PACK_CATALOG_TTL", 60))
+
+_catalog: TTLCache[str, list[dict]] = TTLCache(1, _PACK_CATALOG_TTL)
+
+# Played-theme masks of recently active players
+_PLAYED_THEMES_CACHE_SIZE = int(os.getenv("PLAYED_THEMES_CACHE_SIZE", 10000))
+_PLAYED_THEMES_CACHE_TTL = float(os.getenv("PLAYED_THEMES_CACHE_TTL", 600))
+
+_played_themes = PlayedThemesIndex(_PLAYED_THEMES_CACHE_SIZE, _PLAYED_THEMES_CACHE_TTL)
 
 
 def _parse_jsonb(value) -> dict:
@@ -19,32 +42,63 @@ def _parse_jsonb(value) -> dict:
     return {}
 
 
+def _jsonb_size(value) -> int:
+    return len(value) if isinstance(value, str) else len(json.dumps(value))
+
+
 @dataclass
 class AvailablePack:
     id: UUID
     short_name: str
     name: str
-    pack_file: dict[str, Any]
     number_of_themes: int
     available_themes_count: int
     available_theme_indices: list[int]
 
 
+def _split_pack_file(pack_file: dict[str, Any]) -> tuple[str, str]:
+    """Split pack_file into its meta (everything but themes) and the themes list, as JSON."""
+    meta = {key: value for key, value in pack_file.items() if key != 'themes'}
+    return json.dumps(meta), json.dumps(pack_file.get('themes', []))
+
+
 async def create_pack(short_name: str, name: str, pack_file: dict[str, Any], number_of_themes: int) -> UUID:
-    pool = Database.get_pool()
-    sql = Database.load_sql("packs/create_pack.sql")
-    
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(sql, short_name, name, json.dumps(pack_file), number_of_themes)
+    meta, themes = _split_pack_file(pack_file)
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "packs/create_pack", short_name, name, meta, themes, number_of_themes)
+        _pack_contents.invalidate(row['id'])
+        _catalog.clear()
         return row['id']
 
 
-async def get_pack_by_short_name(short_name: str) -> dict | None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("packs/get_pack_by_short_name.sql")
+async def update_pack(short_name: str, pack_file: dict[str, Any], number_of_themes: int) -> bool:
+    """Rewrite a pack's contents. Bumps its version, so cached copies elsewhere go stale."""
+    meta, themes = _split_pack_file(pack_file)
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "packs/update_pack", short_name, meta, themes, number_of_themes)
+        if not row:
+            return False
+        _pack_contents.invalidate(row['id'])
+        _catalog.clear()
+        return True
+
+
+async def append_pack_themes(short_name: str, themes: list[dict[str, Any]]) -> dict | None:
+    """Append themes to an existing pack server-side. Returns id and the new number_of_themes.
     
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(sql, short_name)
+    Existing themes and the pack version are untouched, so cached parts stay valid.
+    """
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "packs/append_pack_themes", short_name, json.dumps(themes))
+    if not row:
+        return None
+    _catalog.clear()
+    return dict(row)
+
+
+async def get_pack_by_short_name(short_name: str) -> dict | None:
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "packs/get_pack_by_short_name", short_name)
         if not row:
             return None
         result = dict(row)
@@ -52,33 +106,140 @@ async def get_pack_by_short_name(short_name: str) -> dict | None:
         return result
 
 
+async def get_pack_info(short_name: str) -> dict | None:
+    """Get a pack's catalog entry (id, short_name, name, number_of_themes, version) without its contents."""
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "packs/get_pack_info_by_short_name", short_name)
+        return dict(row) if row else None
+
+
+async def _load_pack_parts(pack_id: UUID, theme_indices: list[int]) -> tuple[int | None, Any, dict[int, Any]]:
+    """Fetch a pack's meta and the given themes, caching each part. Version is None if the pack is gone."""
+    async with Database.acquire() as conn:
+        rows = await Database.fetch(conn, "packs/get_pack_themes", pack_id, theme_indices)
+    if not rows:
+        return None, freeze({}), {}
+    
+    version = rows[0]['version']
+    raw_meta = rows[0]['meta']
+    meta = _pack_contents.put(pack_id, version, None, _parse_jsonb(raw_meta), _jsonb_size(raw_meta))
+    themes = {}
+    for row in rows:
+        if row['theme_index'] is None:
+            continue
+        raw_theme = row['content']
+        themes[row['theme_index']] = _pack_contents.put(
+            pack_id, version, row['theme_index'], _parse_jsonb(raw_theme), _jsonb_size(raw_theme)
+        )
+    return version, meta, themes
+
+
+async def get_pack_content(pack_id: UUID, version: int | None, theme_indices: list[int]) -> Mapping[str, Any]:
+    """Get a pack's meta and the given themes as a read-only pack_file-like mapping.
+    
+    'themes' maps theme index to theme, holding only the requested themes. Each
+    part is served from the process-wide cache when the cached copy matches
+    version (taken from the catalog entry), so sessions on the same pack share it.
+    """
+    indices = sorted(set(theme_indices))
+    meta = None
+    themes: dict[int, Any] = {}
+    if version is not None:
+        meta = _pack_contents.get(pack_id, version, None)
+        for index in indices:
+            theme = _pack_contents.get(pack_id, version, index)
+            if theme is not None:
+                themes[index] = theme
+    
+    missing = [index for index in indices if index not in themes]
+    if meta is None or missing:
+        loaded_version, meta, loaded = await _load_pack_parts(pack_id, missing)
+        if loaded_version != version and themes:
+            # The pack was rewritten since the catalog entry was read
+            loaded_version, meta, loaded = await _load_pack_parts(pack_id, indices)
+            themes = {}
+        themes.update(loaded)
+    
+    return MappingProxyType({**meta, 'themes': MappingProxyType(themes)})
+
+
+def pack_cache_stats() -> tuple[CacheStats, int]:
+    """Pack content cache counters and its current size in bytes."""
+    return _pack_contents.stats(), _pack_contents.size_bytes
+
+
 async def get_all_packs() -> list[dict]:
-    pool = Database.get_pool()
-    sql = Database.load_sql("packs/get_all_packs.sql")
-    
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(sql)
-        result = []
-        for row in rows:
-            pack = dict(row)
-            pack['pack_file'] = _parse_jsonb(pack.get('pack_file'))
-            result.append(pack)
-        return result
+    """Get the pack catalog: id, short_name, name, number_of_themes and version, never pack_file."""
+    cached = _catalog.get('all')
+    if cached is None:
+        async with Database.acquire() as conn:
+            rows = await Database.fetch(conn, "packs/get_all_packs")
+        cached = [dict(row) for row in rows]
+        _catalog.set('all', cached)
+    return [dict(pack) for pack in cached]
+
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+async def search_packs(query: str | None, after: str = '', limit: int = 20) -> list[dict]:
+    """One page of catalog entries ordered by short_name, starting after the given short_name.
+    
+    With a query, only packs whose name, short name or any theme name contains it.
+    """
+    async with Database.acquire() as conn:
+        if query:
+            rows = await Database.fetch(conn, "packs/search_packs", _like_pattern(query), after, limit)
+        else:
+            rows = await Database.fetch(conn, "packs/get_packs_page", after, limit)
+        return [dict(row) for row in rows]
 
 
 async def get_player_pack_histories(player_ids: list) -> list[dict]:
     if not player_ids:
         return []
     
-    pool = Database.get_pool()
-    sql = Database.load_sql("packs/get_player_pack_histories.sql")
-    
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(sql, player_ids)
-        return [dict(row) for row in rows]
+    async with Database.acquire() as conn:
+        rows = await Database.fetch(conn, "packs/get_player_pack_histories", player_ids)
+        return [
+            {**dict(row), 'themes_mask': _bits_to_mask(row['themes_mask'])}
+            for row in rows
+        ]
+
+
+def themes_to_mask(themes) -> int:
+    """Bitmask with bit i set for every theme index i."""
+    mask = 0
+    for theme in themes:
+        mask |= 1 << theme
+    return mask
+
+
+def mask_to_themes(mask: int) -> list[int]:
+    """Sorted theme indices whose bits are set in mask."""
+    themes = []
+    index = 0
+    while mask:
+        if mask & 1:
+            themes.append(index)
+        mask >>= 1
+        index += 1
+    return themes
+
+
+def _mask_to_bits(mask: int) -> str:
+    # Postgres bit strings number bits from the left: theme i is character i
+    return bin(mask)[2:][::-1] if mask else ''
+
+
+def _bits_to_mask(bits: str | None) -> int:
+    return int(bits[::-1], 2) if bits else 0
 
 
 def format_themes_as_ranges(themes: list[int]) -> str:
+    """Legacy "0-3,7" representation of theme indices, kept for scripts and logs."""
     if not themes:
         return ''
     
@@ -107,19 +268,60 @@ def format_themes_as_ranges(themes: list[int]) -> str:
 
 
 async def update_player_pack_history(player_id: UUID, pack_id: UUID, themes_played: list[int]) -> None:
-    if not themes_played:
+    await update_player_pack_histories([(player_id, pack_id, themes_played)])
+
+
+async def update_player_pack_histories(entries: list[tuple[UUID, UUID, list[int]]]) -> None:
+    """Record played themes for many (player_id, pack_id, themes) at once in one upsert."""
+    masks: dict[tuple[UUID, UUID], int] = {}
+    for player_id, pack_id, themes_played in entries:
+        if themes_played:
+            key = (player_id, pack_id)
+            # One row per key: ON CONFLICT cannot touch the same row twice
+            masks[key] = masks.get(key, 0) | themes_to_mask(themes_played)
+    if not masks:
         return
     
-    themes_str = format_themes_as_ranges(themes_played)
-    
-    pool = Database.get_pool()
-    sql = Database.load_sql("packs/upsert_player_pack_history.sql")
+    # Consistent lock order across concurrent finalizations
+    keys = sorted(masks, key=lambda key: (str(key[0]), str(key[1])))
+    async with Database.acquire() as conn:
+        await Database.execute(
+            conn, "packs/bulk_upsert_player_pack_history",
+            [player_id for player_id, _ in keys],
+            [pack_id for _, pack_id in keys],
+            [_mask_to_bits(masks[key]) for key in keys],
+        )
+    for (player_id, pack_id), mask in masks.items():
+        _played_themes.merge(player_id, pack_id, mask)
+
+
+async def _load_played_themes(player_ids: list[UUID]) -> None:
+    """Index the pack histories of players not in memory yet, in one query."""
+    missing = _played_themes.missing(player_ids)
+    if not missing:
+        return
     
-    async with pool.acquire() as conn:
-        await conn.execute(sql, player_id, pack_id, themes_str)
+    _played_themes.begin_load(missing)
+    loaded: dict[UUID, dict[UUID, int]] = {player_id: {} for player_id in missing}
+    try:
+        histories = await get_player_pack_histories(missing)
+    except BaseException:
+        _played_themes.abort_load(missing)
+        raise
+    for h in histories:
+        loaded[h['player_id']][h['pack_id']] = h['themes_mask']
+    for player_id, masks in loaded.items():
+        _played_themes.store(player_id, masks)
+
+
+async def get_played_themes_mask(player_id: UUID, pack_id: UUID) -> int:
+    """Bitmask of the pack's themes the player has already played."""
+    await _load_played_themes([player_id])
+    return _played_themes.player_mask(player_id, pack_id)
 
 
 def parse_themes_played(themes_str: str) -> set[int]:
+    """Parse the legacy "0-3,7" representation; see themes_to_mask for the stored form."""
     if not themes_str or not themes_str.strip():
         return set()
     
@@ -135,48 +337,47 @@ def parse_themes_played(themes_str: str) -> set[int]:
 
 
 async def get_available_packs_for_players(player_ids: list, themes_needed: int = 6) -> list[AvailablePack]:
+    """Packs with at least themes_needed themes unplayed by all players, most available first.
+    
+    Histories are loaded into memory once per player and ORed there; if
+    loading fails, one query ORs them in the database instead.
+    """
+    try:
+        await _load_played_themes(player_ids)
+    except Exception as e:
+        print(f"[PACKS] Failed to load played themes: {e}")
+    
+    if _played_themes.missing(player_ids):
+        async with Database.acquire() as conn:
+            rows = await Database.fetch(conn, "packs/get_available_packs", player_ids, themes_needed)
+            return [AvailablePack(**dict(row)) for row in rows]
+    
     all_packs = await get_all_packs()
     if not all_packs:
         return []
     
-    histories = await get_player_pack_histories(player_ids)
-    
-    pack_player_history: dict[str, dict[str, set[int]]] = {}
-    for h in histories:
-        pack_id = str(h['pack_id'])
-        player_id = str(h['player_id'])
-        if pack_id not in pack_player_history:
-            pack_player_history[pack_id] = {}
-        pack_player_history[pack_id][player_id] = parse_themes_played(h['themes_played'])
+    played_by_pack = _played_themes.played_by_any(player_ids)
     
     available_packs: list[AvailablePack] = []
     
     for pack in all_packs:
-        pack_id = str(pack['id'])
         total_themes = pack['number_of_themes']
         
         if total_themes == 0:
             continue
         
-        all_theme_indices = set(range(0, total_themes))
-        
-        themes_played_by_any = set()
-        for player_id in player_ids:
-            player_id_str = str(player_id)
-            if pack_id in pack_player_history and player_id_str in pack_player_history[pack_id]:
-                themes_played_by_any.update(pack_player_history[pack_id][player_id_str])
-        
-        available_themes = all_theme_indices - themes_played_by_any
+        all_themes_mask = (1 << total_themes) - 1
+        available_mask = all_themes_mask & ~played_by_pack.get(pack['id'], 0)
+        available_count = available_mask.bit_count()
         
-        if len(available_themes) >= themes_needed:
+        if available_count >= themes_needed:
             available_packs.append(AvailablePack(
                 id=pack['id'],
                 short_name=pack['short_name'],
                 name=pack['name'],
-                pack_file=pack['pack_file'],
                 number_of_themes=total_themes,
-                available_themes_count=len(available_themes),
-                available_theme_indices=sorted(available_themes)
+                available_themes_count=available_count,
+                available_theme_indices=mask_to_themes(available_mask)
             ))
     
     available_packs.sort(key=lambda p: p.available_themes_count, reverse=True)
@@ -0,0 +1,56 @@
+from uuid import UUID
+
+from database.cache import TTLCache
+
+
+class PlayedThemesIndex:
+    """In-memory copy of player_pack_history: played-theme bitmasks per player and pack.
+
+    A player's rows are loaded on first use and later plays are folded in by
+    update_player_pack_history. Entries are bounded by an LRU with a TTL, so
+    an evicted player is simply loaded again. Masks only ever gain bits, so
+    plays recorded while a load is in flight are ORed into its result.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._masks: TTLCache[UUID, dict[UUID, int]] = TTLCache(maxsize, ttl)
+        self._loading: dict[UUID, dict[UUID, int]] = {}
+
+    def missing(self, player_ids: list[UUID]) -> list[UUID]:
+        return [player_id for player_id in dict.fromkeys(player_ids) if self._masks.get(player_id) is None]
+
+    def begin_load(self, player_ids: list[UUID]) -> None:
+        for player_id in player_ids:
+            self._loading.setdefault(player_id, {})
+
+    def store(self, player_id: UUID, masks: dict[UUID, int]) -> None:
+        """Finish a load started with begin_load."""
+        for known in (self._loading.pop(player_id, {}), self._masks.get(player_id) or {}):
+            for pack_id, mask in known.items():
+                masks[pack_id] = masks.get(pack_id, 0) | mask
+        self._masks.set(player_id, masks)
+
+    def abort_load(self, player_ids: list[UUID]) -> None:
+        """Forget a load started with begin_load that did not complete."""
+        for player_id in player_ids:
+            self._loading.pop(player_id, None)
+
+    def merge(self, player_id: UUID, pack_id: UUID, mask: int) -> None:
+        packs = self._masks.get(player_id)
+        if packs is None:
+            packs = self._loading.get(player_id)
+        if packs is None:
+            # Not in memory: the next load reads it from the database
+            return
+        packs[pack_id] = packs.get(pack_id, 0) | mask
+
+    def played_by_any(self, player_ids: list[UUID]) -> dict[UUID, int]:
+        """Per pack, the themes played by at least one of the players."""
+        played: dict[UUID, int] = {}
+        for player_id in dict.fromkeys(player_ids):
+            for pack_id, mask in (self._masks.get(player_id) or {}).items():
+                played[pack_id] = played.get(pack_id, 0) | mask
+        return played
+
+    def player_mask(self, player_id: UUID, pack_id: UUID) -> int:
+        return (self._masks.get(player_id) or {}).get(pack_id, 0)
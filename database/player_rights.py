@@ -3,21 +3,15 @@ from database.connection import Database
 
 async def get_player_rights(telegram_id: int) -> dict | None:
     """Get player rights by telegram_id."""
-    pool = Database.get_pool()
-    sql = Database.load_sql("player_rights/get_player_rights.sql")
-    
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(sql, telegram_id)
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "player_rights/get_player_rights", telegram_id)
         return dict(row) if row else None
 
 
 async def ensure_player_rights(telegram_id: int) -> dict | None:
     """Ensure player has rights record with defaults, return existing or new."""
-    pool = Database.get_pool()
-    sql = Database.load_sql("player_rights/ensure_player_rights.sql")
-    
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(sql, telegram_id)
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "player_rights/ensure_player_rights", telegram_id)
         return dict(row) if row else None
 
 
@@ -26,20 +20,14 @@ async def get_player_pauses_bulk(telegram_ids: list[int]) -> dict[int, int]:
     if not telegram_ids:
         return {}
     
-    pool = Database.get_pool()
-    sql = Database.load_sql("player_rights/get_player_pauses_bulk.sql")
-    
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(sql, telegram_ids)
+    async with Database.acquire() as conn:
+        rows = await Database.fetch(conn, "player_rights/get_player_pauses_bulk", telegram_ids)
         return {row['telegram_id']: row['number_of_pauses'] for row in rows}
 
 
 async def decrement_pauses(telegram_id: int) -> dict | None:
     """Decrement number_of_pauses by 1 for a player. Returns updated record or None if no pauses left."""
-    pool = Database.get_pool()
-    sql = Database.load_sql("player_rights/decrement_pauses.sql")
-    
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(sql, telegram_id)
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "player_rights/decrement_pauses", telegram_id)
         return dict(row) if row else None
 
@@ -1,53 +1,117 @@
+import os
 from uuid import UUID
 
+from database.cache import CacheStats, TTLCache
 from database.connection import Database
 
+# Player identity (id, telegram_id, names) almost never changes during a game,
+# so lookups on the buzzer path are served from memory. Writes go through
+# upsert_player/ensure_player, which refresh the cache.
+_PLAYER_CACHE_SIZE = int(os.getenv("PLAYER_CACHE_SIZE", 10000))
+_PLAYER_CACHE_TTL = float(os.getenv("PLAYER_CACHE_TTL", 600))
 
-async def upsert_player(telegram_id: int, username: str | None, first_name: str | None, last_name: str | None) -> dict:
-    pool = Database.get_pool()
-    sql = Database.load_sql("players/upsert_player.sql")
+_players_by_telegram_id: TTLCache[int, dict] = TTLCache(_PLAYER_CACHE_SIZE, _PLAYER_CACHE_TTL)
+_telegram_id_by_player_id: TTLCache[UUID, int] = TTLCache(_PLAYER_CACHE_SIZE, _PLAYER_CACHE_TTL)
+
+
+def _remember(row) -> dict:
+    player = dict(row)
     
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(sql, telegram_id, username, first_name, last_name)
-        return dict(row)
+    def cache() -> None:
+        _players_by_telegram_id.set(player['telegram_id'], player)
+        _telegram_id_by_player_id.set(player['id'], player['telegram_id'])
+    
+    # Inside a transaction the row may still be rolled back
+    Database.after_commit(cache)
+    return dict(player)
+
+
+def _cached_by_telegram_id(telegram_id: int) -> dict | None:
+    player = _players_by_telegram_id.get(telegram_id)
+    return dict(player) if player else None
+
+
+def _cached_by_player_id(player_id: UUID) -> dict | None:
+    telegram_id = _telegram_id_by_player_id.get(player_id)
+    if telegram_id is None:
+        return None
+    return _cached_by_telegram_id(telegram_id)
+
+
+def identity_cache_stats() -> tuple[CacheStats, CacheStats]:
+    """Counters of the identity caches keyed by telegram_id and by player_id."""
+    return _players_by_telegram_id.stats(), _telegram_id_by_player_id.stats()
+
+
+async def upsert_player(telegram_id: int, username: str | None, first_name: str | None, last_name: str | None) -> dict:
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "players/upsert_player", telegram_id, username, first_name, last_name)
+        return _remember(row)
+
+
+async def ensure_player(telegram_id: int, username: str | None, first_name: str | None, last_name: str | None) -> dict:
+    """Upsert a player with statistics and rights rows in one statement, skipping unchanged writes."""
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "players/ensure_player", telegram_id, username, first_name, last_name)
+        if row is None:
+            # Lost an insert race with a concurrent registration; the row is visible now
+            row = await Database.fetchrow(conn, "players/ensure_player", telegram_id, username, first_name, last_name)
+        return _remember(row)
 
 
 async def get_player_by_telegram_id(telegram_id: int) -> dict | None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("players/get_player_by_telegram_id.sql")
+    cached = _cached_by_telegram_id(telegram_id)
+    if cached is not None:
+        return cached
     
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(sql, telegram_id)
-        return dict(row) if row else None
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "players/get_player_by_telegram_id", telegram_id)
+        return _remember(row) if row else None
 
 
 async def get_players_telegram_ids(player_ids: list[UUID]) -> list[dict]:
     if not player_ids:
         return []
     
-    pool = Database.get_pool()
-    sql = Database.load_sql("players/get_players_telegram_ids.sql")
+    result: list[dict] = []
+    missing: list[UUID] = []
+    for player_id in player_ids:
+        cached = _cached_by_player_id(player_id)
+        if cached is not None:
+            result.append(cached)
+        else:
+            missing.append(player_id)
+    
+    if missing:
+        async with Database.acquire() as conn:
+            rows = await Database.fetch(conn, "players/get_players_telegram_ids", missing)
+            result.extend(_remember(row) for row in rows)
     
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(sql, player_ids)
-        return [dict(row) for row in rows]
+    return result
 
 
 async def get_players_by_telegram_ids(telegram_ids: list[int]) -> dict[int, dict]:
     if not telegram_ids:
         return {}
     
-    pool = Database.get_pool()
-    sql = Database.load_sql("players/get_players_by_telegram_ids.sql")
+    result: dict[int, dict] = {}
+    missing: list[int] = []
+    for telegram_id in telegram_ids:
+        cached = _cached_by_telegram_id(telegram_id)
+        if cached is not None:
+            result[telegram_id] = cached
+        else:
+            missing.append(telegram_id)
     
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(sql, telegram_ids)
-        return {row['telegram_id']: dict(row) for row in rows}
+    if missing:
+        async with Database.acquire() as conn:
+            rows = await Database.fetch(conn, "players/get_players_by_telegram_ids", missing)
+            for row in rows:
+                result[row['telegram_id']] = _remember(row)
+    
+    return result
 
 
 async def track_player_in_chat(player_id: UUID, chat_id: int) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("players/upsert_player_chat.sql")
-    
-    async with pool.acquire() as conn:
-        await conn.execute(sql, player_id, chat_id)
+    async with Database.acquire() as conn:
+        await Database.execute(conn, "players/upsert_player_chat", player_id, chat_id)
@@ -0,0 +1,86 @@
+import os
+from dataclasses import dataclass, field
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float | None) -> float | None:
+    value = os.getenv(name)
+    if not value:
+        return default
+    return float(value) if float(value) > 0 else None
+
+
+def _parse_server_settings(value: str | None) -> dict[str, str]:
+    """Parse "statement_timeout=5000,application_name=svoyachello" into a dict."""
+    settings: dict[str, str] = {}
+    if not value:
+        return settings
+
+    for part in value.split(','):
+        if '=' not in part:
+            continue
+        key, setting = part.split('=', 1)
+        if key.strip():
+            settings[key.strip()] = setting.strip()
+    return settings
+
+
+@dataclass
+class PoolConfig:
+    min_size: int = 10
+    max_size: int = 10
+    max_inactive_connection_lifetime: float = 300.0
+    statement_cache_size: int = 100
+    prepare_statements: bool = True
+    command_timeout: float | None = None
+    server_settings: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        defaults = cls()
+        max_size = _env_int("DB_POOL_MAX_SIZE", defaults.max_size)
+        return cls(
+            min_size=min(_env_int("DB_POOL_MIN_SIZE", defaults.min_size), max_size),
+            max_size=max_size,
+            max_inactive_connection_lifetime=_env_float(
+                "DB_POOL_MAX_INACTIVE_LIFETIME", defaults.max_inactive_connection_lifetime
+            ) or 0.0,
+            statement_cache_size=_env_int("DB_STATEMENT_CACHE_SIZE", defaults.statement_cache_size),
+            prepare_statements=_env_int("DB_PREPARE_STATEMENTS", int(defaults.prepare_statements)) > 0,
+            command_timeout=_env_float("DB_COMMAND_TIMEOUT", defaults.command_timeout),
+            server_settings=_parse_server_settings(os.getenv("DB_SERVER_SETTINGS")),
+        )
+
+
+@dataclass
+class PoolStats:
+    acquires: int = 0
+    in_use: int = 0
+    waiting: int = 0
+    max_waiting: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def start_wait(self) -> None:
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def end_wait(self, wait: float, acquired: bool) -> None:
+        self.waiting -= 1
+        if not acquired:
+            return
+        self.acquires += 1
+        self.in_use += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def release(self) -> None:
+        self.in_use -= 1
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.acquires if self.acquires else 0.0
@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+import asyncpg
+from asyncpg.prepared_stmt import PreparedStatement
+
+SQL_DIR = Path(__file__).parent.parent / "sql"
+
+
+@dataclass
+class StatementStats:
+    prepared: int = 0
+    executed: int = 0
+    failed_prepares: int = 0
+
+
+class StatementRegistry:
+    """Named registry of every query under sql/.
+
+    Statements are addressed by their path relative to sql/ without the
+    extension, e.g. "games/get_game_by_chat_id". Each pool connection prepares
+    the whole registry once in its init hook, and Database runs queries through
+    those prepared statements, so they never pay parse/plan time on first use
+    on a fresh connection.
+    """
+
+    def __init__(self, sql_dir: Path = SQL_DIR) -> None:
+        self._sql_dir = sql_dir
+        self._statements: dict[str, str] = {}
+        self._stats: dict[str, StatementStats] = {}
+        self._prepared: dict[int, dict[str, PreparedStatement]] = {}
+
+    def load(self) -> None:
+        for sql_path in sorted(self._sql_dir.rglob("*.sql")):
+            name = sql_path.relative_to(self._sql_dir).with_suffix("").as_posix()
+            self._statements[name] = sql_path.read_text()
+            self._stats.setdefault(name, StatementStats())
+
+    def get(self, name: str) -> str:
+        if name not in self._statements:
+            # Allow use before Database.connect() (e.g. from scripts)
+            sql_path = self._sql_dir / f"{name}.sql"
+            self._statements[name] = sql_path.read_text()
+            self._stats.setdefault(name, StatementStats())
+        return self._statements[name]
+
+    def names(self) -> list[str]:
+        return list(self._statements)
+
+    async def prepare_all(self, conn: asyncpg.Connection) -> None:
+        # Pool handlers get a proxy, not this connection, so statements are
+        # looked up by backend pid, which both report.
+        pid = conn.get_server_pid()
+        prepared: dict[str, PreparedStatement] = {}
+        self._prepared[pid] = prepared
+        conn.add_termination_listener(lambda terminated: self._forget(pid, prepared))
+        
+        for name, sql in self._statements.items():
+            try:
+                prepared[name] = await conn.prepare(sql)
+            except asyncpg.PostgresError as e:
+                # A statement for a not-yet-applied migration must not break the pool
+                self._stats[name].failed_prepares += 1
+                print(f"[SQL] Failed to prepare {name}: {e}")
+                continue
+            self._stats[name].prepared += 1
+
+    def prepared(self, conn: asyncpg.Connection, name: str) -> PreparedStatement | None:
+        """The statement prepared for conn by prepare_all, if any."""
+        return self._prepared.get(conn.get_server_pid(), {}).get(name)
+
+    async def reprepare(self, conn: asyncpg.Connection, name: str) -> PreparedStatement:
+        """Prepare name again for conn, replacing a statement a schema change made stale."""
+        prepared = self._prepared.get(conn.get_server_pid())
+        if prepared is not None:
+            prepared.pop(name, None)
+        statement = await conn.prepare(self.get(name))
+        if prepared is not None:
+            prepared[name] = statement
+        self._stats[name].prepared += 1
+        return statement
+
+    def _forget(self, pid: int, prepared: dict[str, PreparedStatement]) -> None:
+        # A new connection may already have reused the pid
+        if self._prepared.get(pid) is prepared:
+            del self._prepared[pid]
+
+    def record_execute(self, name: str) -> None:
+        self._stats.setdefault(name, StatementStats()).executed += 1
+
+    def stats(self) -> dict[str, StatementStats]:
+        return dict(self._stats)
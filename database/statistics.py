@@ -4,39 +4,25 @@ from database.connection import Database
 
 
 async def create_statistics(player_id: UUID) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("statistics/create_statistics.sql")
-    
-    async with pool.acquire() as conn:
-        await conn.execute(sql, player_id)
+    async with Database.acquire() as conn:
+        await Database.execute(conn, "statistics/create_statistics", player_id)
 
 
 async def get_player_statistics(telegram_id: int) -> dict | None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("statistics/get_user_statistics.sql")
-    
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(sql, telegram_id)
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "statistics/get_user_statistics", telegram_id)
         return dict(row) if row else None
 
 
 async def get_statistics_by_player_id(player_id: UUID) -> dict | None:
-    pool = Database.get_pool()
-    
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT * FROM statistics WHERE user_id = $1",
-            player_id
-        )
+    async with Database.acquire() as conn:
+        row = await Database.fetchrow(conn, "statistics/get_statistics_by_player_id", player_id)
         return dict(row) if row else None
 
 
 async def get_rating() -> list[dict]:
-    pool = Database.get_pool()
-    sql = Database.load_sql("statistics/get_rating.sql")
-    
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(sql)
+    async with Database.acquire() as conn:
+        rows = await Database.fetch(conn, "statistics/get_rating")
         return [dict(row) for row in rows]
 
 
@@ -44,20 +30,14 @@ async def get_rating_by_players(player_ids: list[UUID]) -> list[dict]:
     if not player_ids:
         return []
     
-    pool = Database.get_pool()
-    sql = Database.load_sql("statistics/get_rating_by_players.sql")
-    
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(sql, player_ids)
+    async with Database.acquire() as conn:
+        rows = await Database.fetch(conn, "statistics/get_rating_by_players", player_ids)
         return [dict(row) for row in rows]
 
 
 async def get_rating_by_chat(chat_id: int) -> list[dict]:
-    pool = Database.get_pool()
-    sql = Database.load_sql("statistics/get_rating_by_chat.sql")
-    
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(sql, chat_id)
+    async with Database.acquire() as conn:
+        rows = await Database.fetch(conn, "statistics/get_rating_by_chat", chat_id)
         return [dict(row) for row in rows]
 
 
@@ -69,12 +49,10 @@ async def update_player_game_stats(
     wrong_answers: int,
     elo_change: int
 ) -> None:
-    pool = Database.get_pool()
-    sql = Database.load_sql("statistics/update_player_game_stats.sql")
-    
-    async with pool.acquire() as conn:
-        await conn.execute(
-            sql,
+    async with Database.acquire() as conn:
+        await Database.execute(
+            conn,
+            "statistics/update_player_game_stats",
             player_id,
             game_score,
             is_winner,
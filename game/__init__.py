@@ -5,6 +5,13 @@ from .types import (
     GameSession,
 )
 
+from .timer import (
+    PausableTimer,
+    TimerHandle,
+    TimerService,
+    timer_service,
+)
+
 from .sessions import (
     SessionManager,
     session_manager,
@@ -27,6 +34,11 @@ from .end_game import (
     finalize_game,
 )
 
+from .snapshots import (
+    SnapshotWriter,
+    snapshot_writer,
+)
+
 from .partial_display import (
     split_question_into_parts,
     should_display_partially,
@@ -37,6 +49,10 @@ __all__ = [
     'AnswerState',
     'GameStatus',
     'GameSession',
+    'PausableTimer',
+    'TimerHandle',
+    'TimerService',
+    'timer_service',
     'SessionManager',
     'session_manager',
     'start_player_answering',
@@ -47,6 +63,8 @@ __all__ = [
     'mark_answer_accidental',
     'apply_dispute_result',
     'finalize_game',
+    'SnapshotWriter',
+    'snapshot_writer',
     'split_question_into_parts',
     'should_display_partially',
 ]
@@ -103,7 +103,7 @@ def start_player_answering(game_chat_id: int, player_telegram_id: int) -> bool:
     
     session.answering_player_id = player_telegram_id
     session.state = GameState.PLAYER_ANSWERING
-    session.timer_extension = 15.0
+    session.set_timer_remaining(15.0)
     return True
 
 
@@ -134,10 +134,11 @@ def submit_answer(game_chat_id: int, player_telegram_id: int, answer_text: str)
     session.state = GameState.WAITING_ANSWER
     session.answering_player_id = None
     
-    session.timer_extension = 8.0
+    session.set_timer_remaining(8.0)
     
     if is_correct and session.answer_event:
         session.answer_event.set()
+    session.timer.notify()
     
     return is_correct
 
@@ -152,6 +153,6 @@ def cancel_answering(game_chat_id: int) -> bool:
     
     session.answering_player_id = None
     session.state = GameState.WAITING_ANSWER
-    session.timer_extension = 10
+    session.set_timer_remaining(10)
     return True
 
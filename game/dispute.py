@@ -4,6 +4,8 @@ from typing import TYPE_CHECKING
 
 from aiogram import Bot
 
+from outbox import outbox, Priority
+
 if TYPE_CHECKING:
     from .types import GameSession
 
@@ -80,7 +82,7 @@ async def apply_dispute_result(session: GameSession, bot: Bot) -> None:
         session.dispute_votes = None
         return
     
-    session.timer_extension = 5.0
+    session.set_timer_remaining(5.0)
     
     yes_votes = sum(1 for v in session.dispute_votes.values() if v)
     no_votes = sum(1 for v in session.dispute_votes.values() if not v)
@@ -89,21 +91,27 @@ async def apply_dispute_result(session: GameSession, bot: Bot) -> None:
     
     if yes_votes > no_votes:
         mark_answer_correct(session, player_id)
-        await bot.send_message(
+        await outbox.send(
+            bot,
             session.game_chat_id,
-            f"🗳 Результат голосования: ✅ засчитать ({yes_votes} за, {no_votes} против)"
+            f"🗳 Результат голосования: ✅ засчитать ({yes_votes} за, {no_votes} против)",
+            priority=Priority.GAME
         )
     elif no_votes > yes_votes:
         mark_answer_incorrect(session, player_id)
-        await bot.send_message(
+        await outbox.send(
+            bot,
             session.game_chat_id,
-            f"🗳 Результат голосования: ❌ не засчитывать ({yes_votes} за, {no_votes} против)"
+            f"🗳 Результат голосования: ❌ не засчитывать ({yes_votes} за, {no_votes} против)",
+            priority=Priority.GAME
         )
     else:
         mark_answer_accidental(session, player_id)
-        await bot.send_message(
+        await outbox.send(
+            bot,
             session.game_chat_id,
-            f"🗳 Голоса разделились поровну ({yes_votes}:{no_votes}). Ответ не засчитывается."
+            f"🗳 Голоса разделились поровну ({yes_votes}:{no_votes}). Ответ не засчитывается.",
+            priority=Priority.GAME
         )
     
     if session.dispute_poll_id:
@@ -1,9 +1,10 @@
-import asyncio
 from uuid import UUID
 
 from aiogram import Bot
 
 from database import games, game_chats, packs, players, statistics
+from outbox import outbox, Priority
+from game.timer import timer_service
 from game.types import GameStatus
 
 
@@ -34,21 +35,15 @@ async def revoke_invite_link(bot: Bot, game_chat_id: int, invite_link: str) -> N
         pass
 
 
-async def calculate_player_rankings(session, uuid_to_info: dict[str, dict]) -> tuple:
+async def calculate_player_rankings(session, score_rows: dict[UUID, dict]) -> tuple:
     """Calculate player scores, sort players, and determine winners."""
-    scores = await games.get_game_scores(session.game_chat_id)
-    
     player_scores: dict[UUID, int] = {}
     player_abs_scores: dict[UUID, int] = {}
     
     for player_uuid in session.players:
-        uuid_str = str(player_uuid)
-        player_scores[player_uuid] = int(scores.get(uuid_str, 0))
-        
-        if session.player_abs_scores:
-            player_abs_scores[player_uuid] = session.player_abs_scores.get(player_uuid, 0)
-        else:
-            player_abs_scores[player_uuid] = 0
+        row = score_rows.get(player_uuid, {})
+        player_scores[player_uuid] = row.get('score', 0)
+        player_abs_scores[player_uuid] = row.get('abs_score', 0)
     
     sorted_players = sorted(
         session.players,
@@ -79,30 +74,21 @@ async def get_player_ratings(player_uuids: list[UUID]) -> dict[UUID, int]:
 
 async def update_player_statistics(session, player_scores: dict[UUID, int], winners: set[UUID], 
                                    player_ratings: dict[UUID, int], elo_changes: dict[UUID, int],
-                                   uuid_to_info: dict[str, dict]) -> None:
+                                   score_rows: dict[UUID, dict]) -> None:
     """Update game statistics for all players."""
     for player_uuid in session.players:
         is_winner = player_uuid in winners
         game_score = player_scores.get(player_uuid, 0)
         elo_change = elo_changes.get(player_uuid, 0)
         
-        info = uuid_to_info.get(str(player_uuid), {})
-        telegram_id = info.get('telegram_id')
-        correct_answers = 0
-        wrong_answers = 0
-        
-        if telegram_id:
-            if session.player_correct_answers:
-                correct_answers = session.player_correct_answers.get(telegram_id, 0)
-            if session.player_wrong_answers:
-                wrong_answers = session.player_wrong_answers.get(telegram_id, 0)
+        row = score_rows.get(player_uuid, {})
         
         await statistics.update_player_game_stats(
             player_id=player_uuid,
             game_score=game_score,
             is_winner=is_winner,
-            correct_answers=correct_answers,
-            wrong_answers=wrong_answers,
+            correct_answers=row.get('correct', 0),
+            wrong_answers=row.get('wrong', 0),
             elo_change=elo_change
         )
 
@@ -129,19 +115,22 @@ async def send_game_results(bot: Bot, session, sorted_players: list[UUID],
     
     results_message = "📊 <b>Итоги игры:</b>\n\n" + "\n".join(result_lines)
     
-    await bot.send_message(session.game_chat_id, results_message, parse_mode="HTML")
+    await outbox.send(bot, session.game_chat_id, results_message, parse_mode="HTML", priority=Priority.INFO)
 
-    await bot.send_message(session.game_chat_id, messages.msg_players_kick_warning())
+    await outbox.send(bot, session.game_chat_id, messages.msg_players_kick_warning(), priority=Priority.INFO)
     
     if session.origin_chat_id != session.game_chat_id:
         try:
-            await bot.send_message(session.origin_chat_id, results_message, parse_mode="HTML")
+            await outbox.send(bot, session.origin_chat_id, results_message, parse_mode="HTML", priority=Priority.INFO)
         except Exception:
             pass
 
 
-async def update_pack_history(session, pack_id: UUID, user_uuids: list[UUID], up_to_current: bool = False) -> None:
-    """Update pack history for players or spectators."""
+def pack_history_entries(
+    session, pack_id: UUID, user_uuids: list[UUID], up_to_current: bool = False
+) -> list[tuple[UUID, UUID, list[int]]]:
+    """Themes each player or spectator has played in this session, as history entries."""
+    entries: list[tuple[UUID, UUID, list[int]]] = []
     for user_uuid in user_uuids:
         start_idx = 0
         if session.player_start_theme_idx:
@@ -161,9 +150,16 @@ async def update_pack_history(session, pack_id: UUID, user_uuids: list[UUID], up
         
         if user_themes:
             print(f"[PACK HISTORY] Player {user_uuid}: pack={pack_id}, themes={user_themes}, start_idx={start_idx}, up_to_current={up_to_current}")
-            await packs.update_player_pack_history(user_uuid, pack_id, user_themes)
+            entries.append((user_uuid, pack_id, user_themes))
         else:
             print(f"[PACK HISTORY] Player {user_uuid}: no themes to save, start_idx={start_idx}, up_to_current={up_to_current}")
+    
+    return entries
+
+
+async def update_pack_history(session, pack_id: UUID, user_uuids: list[UUID], up_to_current: bool = False) -> None:
+    """Update pack history for players and spectators in one batched write."""
+    await packs.update_player_pack_histories(pack_history_entries(session, pack_id, user_uuids, up_to_current))
 
 
 async def cleanup_game(game_id: UUID, game_chat_id: int) -> None:
@@ -172,8 +168,11 @@ async def cleanup_game(game_id: UUID, game_chat_id: int) -> None:
     await games.delete_game(game_chat_id)
 
 
-async def finalize_game(chat_id: int, bot: Bot, is_aborted: bool = False) -> None:
-    """Finalize a game session: update statistics, send results, and cleanup."""
+async def finalize_game(chat_id: int, bot: Bot, is_aborted: bool = False, save_history: bool = True) -> None:
+    """Finalize a game session: update statistics, send results, and cleanup.
+    
+    save_history=False is for callers that already wrote the pack history in bulk.
+    """
     from .sessions import session_manager
     
     game = await games.get_game_by_chat_id(chat_id)
@@ -203,14 +202,13 @@ async def finalize_game(chat_id: int, bot: Bot, is_aborted: bool = False) -> Non
         spectator_telegram_ids = [info['telegram_id'] for info in spectators_info if info.get('telegram_id')]
     
     if is_aborted:
-        pack = await packs.get_pack_by_short_name(game['pack_short_name'])
+        pack = await packs.get_pack_info(game['pack_short_name']) if save_history else None
         if pack:
-            await update_pack_history(session, pack['id'], session.players, up_to_current=True)
-            
-            if session.spectators:
-                await update_pack_history(session, pack['id'], session.spectators, up_to_current=True)
+            await update_pack_history(
+                session, pack['id'], session.players + (session.spectators or []), up_to_current=True
+            )
 
-        await asyncio.sleep(20)
+        await timer_service.sleep(20, "kick")
 
         await kick_users_from_game_chat(bot, game_chat_id, player_telegram_ids)
         await kick_users_from_game_chat(bot, game_chat_id, spectator_telegram_ids)
@@ -224,7 +222,8 @@ async def finalize_game(chat_id: int, bot: Bot, is_aborted: bool = False) -> Non
     
     uuid_to_info: dict[str, dict] = {str(info['id']): info for info in players_info}
     
-    player_scores, sorted_players, winners = await calculate_player_rankings(session, uuid_to_info)
+    score_rows = await games.get_game_player_scores(chat_id)
+    player_scores, sorted_players, winners = await calculate_player_rankings(session, score_rows)
     
     player_ratings = await get_player_ratings(session.players)
     
@@ -232,21 +231,18 @@ async def finalize_game(chat_id: int, bot: Bot, is_aborted: bool = False) -> Non
     if len(session.players) >= 2:
         elo_changes = statistics.calculate_elo_changes(player_ratings, player_scores)
     
-    await update_player_statistics(session, player_scores, winners, player_ratings, elo_changes, uuid_to_info)
+    await update_player_statistics(session, player_scores, winners, player_ratings, elo_changes, score_rows)
     
     for player_uuid in session.players:
         await players.track_player_in_chat(player_uuid, session.origin_chat_id)
     
     await send_game_results(bot, session, sorted_players, player_scores, player_ratings, elo_changes, uuid_to_info)
     
-    pack = await packs.get_pack_by_short_name(game['pack_short_name'])
+    pack = await packs.get_pack_info(game['pack_short_name']) if save_history else None
     if pack:
-        await update_pack_history(session, pack['id'], session.players)
-        
-        if session.spectators:
-            await update_pack_history(session, pack['id'], session.spectators)
+        await update_pack_history(session, pack['id'], session.players + (session.spectators or []))
 
-    await asyncio.sleep(60)
+    await timer_service.sleep(60, "kick")
     
     await kick_users_from_game_chat(bot, game_chat_id, player_telegram_ids)
     await kick_users_from_game_chat(bot, game_chat_id, spectator_telegram_ids)
@@ -1,102 +1,97 @@
 import asyncio
+from typing import Any
 
 from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
 
 from database import games
+from outbox import outbox, Priority
 import messages
 from .types import GameState, GameStatus, GameSession
 from .scoring import finalize_question_scores, show_current_scores
 from .partial_display import split_question_into_parts, should_display_partially
+from .reveal import QuestionReveal
+from .snapshots import snapshot_writer
 
 
-async def wait_with_pause(session: GameSession, seconds: float) -> None:
-    if not session.pause_event:
-        await asyncio.sleep(seconds)
-        return
+def send_answer(bot: Bot, chat_id: int, answer_text: str, comment: str, reply_markup: Any) -> None:
+    """Queue the answer message; each attempt is its own outbox send."""
+    def retry_plain(future: asyncio.Future) -> None:
+        if future.cancelled() or not isinstance(future.exception(), TelegramBadRequest):
+            return
+        # If answer display fails, try without HTML parsing
+        outbox.send(bot, chat_id, f"Ответ: {answer_text}", priority=Priority.GAME, reply_markup=reply_markup)
     
-    remaining = seconds
-    while remaining > 0:
-        if not session.pause_event.is_set():
-            await session.pause_event.wait()
-        
-        if session.timer_extension > 0:
-            remaining = session.timer_extension
-            session.timer_extension = 0.0
-        
-        sleep_time = min(0.5, remaining)
-        await asyncio.sleep(sleep_time)
-        
-        if session.pause_event.is_set():
-            remaining -= sleep_time
+    outbox.send(
+        bot,
+        chat_id,
+        messages.msg_answer(answer_text, comment),
+        priority=Priority.GAME,
+        parse_mode="HTML",
+        reply_markup=reply_markup
+    ).add_done_callback(retry_plain)
+
+
+async def wait_with_pause(session: GameSession, seconds: float) -> None:
+    await session.timer.wait(seconds)
 
 
 async def wait_for_answer_or_timeout(session: GameSession) -> bool:
-    if not session.answer_event or not session.pause_event:
-        await asyncio.sleep(session.timer_extension)
-        session.timer_extension = 0.0
+    """Wait up to 15 s of unpaused time for the question to be settled.
+    
+    Settled means a correct answer (answer_event) or every non-spectator
+    having answered. Wakes only on the deadline or timer changes; answers
+    notify the timer.
+    """
+    if not session.answer_event:
         return False
     
-    remaining = 15.0
-
+    answer_event = session.answer_event
+    
     total_players = len(session.players)
     if session.spectators:
         total_players = len([p for p in session.players if p not in session.spectators])
     
-    while remaining > 0:
-        if not session.pause_event.is_set():
-            await session.pause_event.wait()
-            continue
-        
-        if session.answer_event.is_set():
+    def settled() -> bool:
+        if answer_event.is_set():
             return True
-        
-        if session.answered_players and len(session.answered_players) >= total_players:
-            return True
-        
-        if session.timer_extension > 0:
-            remaining = session.timer_extension
-            session.timer_extension = 0.0
-        
-        sleep_time = min(0.1, remaining)
-        await asyncio.sleep(sleep_time)
-        remaining -= sleep_time
+        return bool(session.answered_players) and len(session.answered_players) >= total_players
     
-    return False
+    return await session.timer.wait(15.0, until=settled)
 
 
 async def game_loop(session: GameSession, bot: Bot) -> None:
     try:
-        themes = session.pack_file.get('themes', [])
+        # Only the themes this game plays, keyed by their index in the pack
+        themes = session.pack_file.get('themes', {})
         pack_info = session.pack_file.get('info', '')
         
         if pack_info and session.current_theme_idx == 0 and session.current_question_idx == 0:
-            try:
-                await bot.send_message(
-                    session.game_chat_id,
-                    messages.msg_pack_info(pack_info),
-                    parse_mode="HTML"
-                )
-            except Exception:
-                pass
+            outbox.send(
+                bot,
+                session.game_chat_id,
+                messages.msg_pack_info(pack_info),
+                parse_mode="HTML",
+                priority=Priority.GAME
+            )
             await wait_with_pause(session, 5)
             
         # Display list of themes that will be played
         theme_names = []
         for idx, theme_idx in enumerate(session.pack_themes, 1):
-            if theme_idx < len(themes):
+            if theme_idx in themes:
                 theme_name = themes[theme_idx].get('name', f'Тема {theme_idx + 1}')
                 theme_names.append(f"{idx}. {theme_name}")
         
         if theme_names:
-            try:
-                await bot.send_message(
-                    session.game_chat_id,
-                    messages.msg_themes_list(theme_names),
-                    parse_mode="HTML"
-                )
-            except Exception:
-                pass
+            outbox.send(
+                bot,
+                session.game_chat_id,
+                messages.msg_themes_list(theme_names),
+                parse_mode="HTML",
+                priority=Priority.GAME
+            )
             await wait_with_pause(session, 5)
         
         theme_idx = session.current_theme_idx
@@ -104,7 +99,7 @@ async def game_loop(session: GameSession, bot: Bot) -> None:
         while theme_idx < len(session.pack_themes):
             pack_theme_index = session.pack_themes[theme_idx]
             
-            if pack_theme_index >= len(themes):
+            if pack_theme_index not in themes:
                 theme_idx += 1
                 continue
             
@@ -113,26 +108,24 @@ async def game_loop(session: GameSession, bot: Bot) -> None:
             
             # Send message about remaining themes
             themes_left = len(session.pack_themes) - theme_idx
-            try:
-                await bot.send_message(
-                    session.game_chat_id,
-                    f"Осталось тем: {themes_left}",
-                    parse_mode="HTML"
-                )
-            except Exception:
-                pass
+            outbox.send(
+                bot,
+                session.game_chat_id,
+                f"Осталось тем: {themes_left}",
+                parse_mode="HTML",
+                priority=Priority.GAME
+            )
             await wait_with_pause(session, 3)
             
             session.state = GameState.SHOWING_THEME
             theme_comment = theme.get('theme_comment', '')
-            try:
-                await bot.send_message(
-                    session.game_chat_id,
-                    messages.msg_theme_name(f"Тема {theme_idx + 1}: {theme_name}", theme_comment),
-                    parse_mode="HTML"
-                )
-            except Exception:
-                pass
+            outbox.send(
+                bot,
+                session.game_chat_id,
+                messages.msg_theme_name(f"Тема {theme_idx + 1}: {theme_name}", theme_comment),
+                parse_mode="HTML",
+                priority=Priority.GAME
+            )
             await wait_with_pause(session, 7)
             
             questions = theme.get('questions', [])
@@ -164,62 +157,64 @@ async def game_loop(session: GameSession, bot: Bot) -> None:
                 )
                 
                 # Show "Attention, question!" with the answer keyboard
-                try:
-                    await bot.send_message(
-                        session.game_chat_id,
-                        messages.msg_attention_question(),
-                        reply_markup=answer_keyboard
-                    )
-                except Exception:
-                    pass
+                outbox.send(
+                    bot,
+                    session.game_chat_id,
+                    messages.msg_attention_question(),
+                    reply_markup=answer_keyboard,
+                    priority=Priority.GAME
+                )
                 await wait_with_pause(session, 2)
                 
                 # Check if question should be displayed in parts
                 if session.partial_display_enabled and should_display_partially(question_text):
                     # Split question into parts
-                    session.current_question_parts = split_question_into_parts(question_text)
+                    parts = split_question_into_parts(question_text)
+                    session.current_question_parts = parts
                     session.current_part_index = 0
-                    total_parts = len(session.current_question_parts)
+                    total_parts = len(parts)
                     
                     # Display first part
-                    first_part = session.current_question_parts[0]
+                    first_part = parts[0]
                     try:
-                        question_msg = await bot.send_message(
+                        question_msg = await outbox.send(
+                            bot,
                             session.game_chat_id,
                             messages.msg_question_partial(cost, short_theme_name, first_part, 1, total_parts),
-                            parse_mode="HTML"
+                            parse_mode="HTML",
+                            priority=Priority.GAME
                         )
                     except Exception:
                         # If question display fails, skip to next question
                         question_idx += 1
                         continue
                     
-                    # Display remaining parts progressively
-                    # Each part already contains accumulated text, so just use it directly
-                    for part_idx in range(1, total_parts):
-                        await wait_with_pause(session, 0.5)  # Wait between parts
-                        session.current_part_index = part_idx
-                        current_part_text = session.current_question_parts[part_idx]
-                        
-                        # Edit message to show current accumulated text
-                        try:
-                            await bot.edit_message_text(
-                                chat_id=session.game_chat_id,
-                                message_id=question_msg.message_id,
-                                text=messages.msg_question_partial(cost, short_theme_name, current_part_text, part_idx + 1, total_parts),
-                                parse_mode="HTML"
-                            )
-                        except Exception:
-                            pass
+                    # Reveal the remaining parts as the chat's send budget allows
+                    reveal = QuestionReveal(
+                        bot,
+                        session.game_chat_id,
+                        question_msg.message_id,
+                        lambda part_idx: messages.msg_question_partial(
+                            cost, short_theme_name, parts[part_idx], part_idx + 1, total_parts
+                        ),
+                        total_parts,
+                        session.timer,
+                    )
+                    session.question_reveal = reveal
+                    await reveal.run()
+                    session.current_part_index = reveal.part_index
                 else:
                     # Display question all at once (normal behavior)
                     session.current_question_parts = None
                     session.current_part_index = 0
+                    session.question_reveal = None
                     try:
-                        question_msg = await bot.send_message(
+                        question_msg = await outbox.send(
+                            bot,
                             session.game_chat_id,
                             messages.msg_question(cost, short_theme_name, question_text),
-                            parse_mode="HTML"
+                            parse_mode="HTML",
+                            priority=Priority.GAME
                         )
                     except Exception:
                         # If question display fails, skip to next question
@@ -267,42 +262,13 @@ async def game_loop(session: GameSession, bot: Bot) -> None:
                 # Remove keyboard after score correction
                 remove_keyboard = ReplyKeyboardRemove()
                 
-                if session.answered_players:
-                    try:
-                        await bot.send_message(
-                            session.game_chat_id,
-                            messages.msg_answer(answer_text, comment),
-                            parse_mode="HTML",
-                            reply_markup=correction_keyboard
-                        )
-                    except Exception:
-                        # If answer display fails, try without HTML parsing
-                        try:
-                            await bot.send_message(
-                                session.game_chat_id,
-                                f"Ответ: {answer_text}",
-                                reply_markup=correction_keyboard
-                            )
-                        except Exception:
-                            pass
-                else:
-                    try:
-                        await bot.send_message(
-                            session.game_chat_id,
-                            messages.msg_answer(answer_text, comment),
-                            parse_mode="HTML",
-                            reply_markup=remove_keyboard
-                        )
-                    except Exception:
-                        # If answer display fails, try without HTML parsing
-                        try:
-                            await bot.send_message(
-                                session.game_chat_id,
-                                f"Ответ: {answer_text}",
-                                reply_markup=remove_keyboard
-                            )
-                        except Exception:
-                            pass
+                send_answer(
+                    bot,
+                    session.game_chat_id,
+                    answer_text,
+                    comment,
+                    correction_keyboard if session.answered_players else remove_keyboard,
+                )
                 
                 if session.answered_players:
                     session.state = GameState.SCORE_CORRECTION
@@ -313,15 +279,17 @@ async def game_loop(session: GameSession, bot: Bot) -> None:
                     await wait_with_pause(session, 5)
                 
                 question_idx += 1
+                snapshot_writer.save(session, theme_idx, question_idx)
             
             await show_current_scores(session, bot)
             await wait_with_pause(session, 5)
             
             session.current_question_idx = 0
             theme_idx += 1
+            snapshot_writer.save(session, theme_idx, 0)
         
         session.state = GameState.GAME_OVER
-        await bot.send_message(session.game_chat_id, messages.msg_game_over())
+        outbox.send(bot, session.game_chat_id, messages.msg_game_over(), priority=Priority.GAME)
         await games.update_game_status(session.game_chat_id, GameStatus.FINISHED)
         
         from .end_game import finalize_game
@@ -330,6 +298,6 @@ async def game_loop(session: GameSession, bot: Bot) -> None:
     except asyncio.CancelledError:
         raise
     except Exception as e:
-        await bot.send_message(session.game_chat_id, messages.msg_error(str(e)))
+        await outbox.send(bot, session.game_chat_id, messages.msg_error(str(e)), priority=Priority.GAME)
         session.state = GameState.IDLE
 
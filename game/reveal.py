@@ -0,0 +1,110 @@
+import asyncio
+import os
+import time
+from typing import Callable
+
+from aiogram import Bot
+
+from outbox import outbox
+from .timer import PausableTimer
+
+# Seconds of unpaused time between reveal steps
+REVEAL_STEP_SECONDS = float(os.getenv("REVEAL_STEP_SECONDS", 0.5))
+# Sends kept in hand for the messages that follow a question (hide, answer, scores)
+REVEAL_RESERVED_SENDS = float(os.getenv("REVEAL_RESERVED_SENDS", 3))
+
+
+def question_key(message_id: int) -> str:
+    """Outbox key shared by every edit of a question message."""
+    return f"question:{message_id}"
+
+
+class QuestionReveal:
+    """Progressive reveal of one question message, paced by the chat's send budget.
+
+    A part is due every REVEAL_STEP_SECONDS. The due part is edited in only
+    while the chat has budget beyond REVEAL_RESERVED_SENDS; otherwise the step
+    is skipped and a later edit jumps straight to a longer part. The last part
+    is always sent. Edits share the message's outbox key, so a still-queued
+    edit is replaced by the newer text instead of being sent stale.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        chat_id: int,
+        message_id: int,
+        render: Callable[[int], str],
+        total_parts: int,
+        timer: PausableTimer | None = None,
+    ) -> None:
+        self.bot = bot
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.total_parts = total_parts
+        self.part_index = 0
+        self.edits = 0
+        self.skipped = 0
+        self.cancelled = False
+        self._final: asyncio.Future | None = None
+        self._render = render
+        self._timer = timer
+        self._started = time.monotonic()
+
+    async def _wait(self, seconds: float) -> None:
+        if self._timer:
+            await self._timer.wait(seconds)
+        else:
+            await asyncio.sleep(seconds)
+
+    async def run(self) -> None:
+        """Reveal the remaining parts on schedule; returns once the last one is queued."""
+        for part_idx in range(1, self.total_parts):
+            await self._wait(REVEAL_STEP_SECONDS)
+            if self.cancelled:
+                return
+            
+            is_last = part_idx == self.total_parts - 1
+            if not is_last and outbox.budget(self.chat_id) < 1 + REVEAL_RESERVED_SENDS:
+                self.skipped += 1
+                continue
+            
+            self.part_index = part_idx
+            self.edits += 1
+            future = outbox.edit(
+                self.bot,
+                self.chat_id,
+                self.message_id,
+                self._render(part_idx),
+                key=question_key(self.message_id),
+                parse_mode="HTML"
+            )
+            if is_last:
+                self._final = future
+                future.add_done_callback(self._report)
+
+    def cancel(self) -> None:
+        """Stop revealing and drop a reveal edit that has not been sent yet."""
+        if self.cancelled:
+            return
+        self.cancelled = True
+        outbox.cancel(self.chat_id, question_key(self.message_id))
+        # Once the last part is queued its future reports the outcome
+        if self._final is None:
+            self._log("cancelled by a buzz")
+
+    def _report(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            self._log("cancelled by a buzz")
+        elif future.exception():
+            self._log(f"failed: {future.exception()}")
+        else:
+            self._log("full text shown")
+
+    def _log(self, outcome: str) -> None:
+        latency = time.monotonic() - self._started
+        scheduled = (self.total_parts - 1) * REVEAL_STEP_SECONDS
+        print(
+            f"[REVEAL] Chat {self.chat_id}: {outcome} after {latency:.1f}s "
+            f"(scheduled {scheduled:.1f}s), {self.edits} edits, {self.skipped} parts skipped"
+        )
@@ -1,13 +1,16 @@
+import asyncio
 from uuid import UUID
 
 from aiogram import Bot
 
 from database import games, players
+from outbox import outbox, Priority
 import messages
 from .types import GameSession, AnswerState
 
 
 async def finalize_question_scores(session: GameSession, cost: int, bot: Bot) -> None:
+    """Commit the question's scores and mark it done, so a restore does not replay it."""
     if not session.answered_players:
         return
     
@@ -18,7 +21,7 @@ async def finalize_question_scores(session: GameSession, cost: int, bot: Bot) ->
     telegram_ids = list(session.answered_players.keys())
     players_by_telegram_id = await players.get_players_by_telegram_ids(telegram_ids)
     
-    score_changes: dict[UUID, int] = {}
+    score_changes: dict[UUID, games.ScoreDelta] = {}
     score_messages = []
     
     for telegram_id, answer_state in session.answered_players.items():
@@ -29,23 +32,25 @@ async def finalize_question_scores(session: GameSession, cost: int, bot: Bot) ->
         player_uuid = player['id']
         
         if answer_state == AnswerState.CORRECT:
-            score_changes[player_uuid] = cost
+            score_changes[player_uuid] = games.ScoreDelta(score=cost, abs_score=cost, correct=1)
             score_messages.append(f"✅ +{cost}")
             if session.player_correct_answers is not None:
                 session.player_correct_answers[telegram_id] = session.player_correct_answers.get(telegram_id, 0) + 1
             if session.player_abs_scores is not None:
                 session.player_abs_scores[player_uuid] = session.player_abs_scores.get(player_uuid, 0) + cost
         elif answer_state == AnswerState.INCORRECT:
-            score_changes[player_uuid] = -cost
+            score_changes[player_uuid] = games.ScoreDelta(score=-cost, wrong=1)
             score_messages.append(f"❌ -{cost}")
             if session.player_wrong_answers is not None:
                 session.player_wrong_answers[telegram_id] = session.player_wrong_answers.get(telegram_id, 0) + 1
     
     if score_changes:
-        await games.bulk_update_player_scores(session.game_chat_id, score_changes)
+        done = (session.current_theme_idx, session.current_question_idx + 1)
+        await games.apply_score_deltas(session.game_chat_id, score_changes, position=done)
 
 
-async def show_current_scores(session: GameSession, bot: Bot) -> None:
+async def show_current_scores(session: GameSession, bot: Bot) -> asyncio.Future | None:
+    """Read the scores now and queue the table without waiting for it to be sent."""
     scores = await games.get_game_scores(session.game_chat_id)
     players_info = await players.get_players_telegram_ids(session.players)
     
@@ -65,9 +70,11 @@ async def show_current_scores(session: GameSession, bot: Bot) -> None:
     
     score_lines.sort(key=lambda x: x[0], reverse=True)
     
-    if score_lines:
-        await bot.send_message(
-            session.game_chat_id,
-            messages.msg_current_scores([line for _, line in score_lines])
-        )
-
+    if not score_lines:
+        return None
+    return outbox.send(
+        bot,
+        session.game_chat_id,
+        messages.msg_current_scores([line for _, line in score_lines]),
+        priority=Priority.INFO
+    )
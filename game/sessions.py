@@ -4,14 +4,18 @@ from uuid import UUID
 from aiogram import Bot
 
 from database import games, packs, game_chats, players, player_rights
+from outbox import outbox, Priority
 import messages
-from .types import GameState, GameSession
+from .types import GameState, GameSession, GameStatus
+from .snapshots import apply_snapshot, snapshot_writer
 
 
 class SessionManager:
     def __init__(self) -> None:
         self._sessions: dict[int, GameSession] = {}
         self._poll_to_chat: dict[str, int] = {}
+        # Chats whose session is being built, so start() and restore() can't both build one
+        self._starting: set[int] = set()
     
     def register_poll(self, poll_id: str, chat_id: int) -> None:
         self._poll_to_chat[poll_id] = chat_id
@@ -22,18 +26,21 @@ class SessionManager:
     def get_chat_by_poll(self, poll_id: str) -> int | None:
         return self._poll_to_chat.get(poll_id)
     
-    async def start(self, game_chat_id: int, origin_chat_id: int, bot: Bot) -> None:
-        if game_chat_id in self._sessions:
-            return
-        
-        game = await games.get_game_by_chat_id(game_chat_id)
-        if not game:
-            return
+    def _reserve(self, game_chat_id: int) -> bool:
+        """Claim game_chat_id before building its session; False if it has or is getting one."""
+        if game_chat_id in self._sessions or game_chat_id in self._starting:
+            return False
+        self._starting.add(game_chat_id)
+        return True
+    
+    async def _create_session(self, game: dict, origin_chat_id: int, bot: Bot) -> GameSession | None:
+        game_chat_id = game['chat_id']
         
-        pack = await packs.get_pack_by_short_name(game['pack_short_name'])
+        pack = await packs.get_pack_info(game['pack_short_name'])
         if not pack:
-            await bot.send_message(game_chat_id, messages.msg_pack_not_found())
-            return
+            await outbox.send(bot, game_chat_id, messages.msg_pack_not_found(), priority=Priority.GAME)
+            return None
+        pack_file = await packs.get_pack_content(pack['id'], pack['version'], game['pack_themes'])
         
         # Get telegram_ids for all players
         player_telegram_data = await players.get_players_telegram_ids(game['players'])
@@ -45,7 +52,7 @@ class SessionManager:
         session = GameSession.create(
             game_chat_id=game_chat_id,
             origin_chat_id=origin_chat_id,
-            pack_file=pack['pack_file'],
+            pack_file=pack_file,
             pack_themes=game['pack_themes'],
             players=game['players'],
             invite_link=game.get('invite_link'),
@@ -53,17 +60,113 @@ class SessionManager:
         
         # Set player pauses
         session.player_pauses = player_pauses
+        return session
+    
+    async def start(self, game_chat_id: int, origin_chat_id: int, bot: Bot) -> None:
+        if not self._reserve(game_chat_id):
+            return
+        
+        try:
+            game = await games.get_game_by_chat_id(game_chat_id)
+            if not game:
+                return
+            
+            session = await self._create_session(game, origin_chat_id, bot)
+            if not session:
+                return
 
-        self._sessions[game_chat_id] = session
+            self._sessions[game_chat_id] = session
+            
+            if game.get('game_mode') == 'private' and game.get('invite_link'):
+                try:
+                    await bot.revoke_chat_invite_link(game_chat_id, game['invite_link'])
+                except Exception:
+                    pass
+            
+            from .game_loop import game_loop
+            session.task = asyncio.create_task(game_loop(session, bot))
+        finally:
+            self._starting.discard(game_chat_id)
+    
+    async def restore(self, game: dict, bot: Bot) -> bool:
+        """Rebuild the session of a game that was running when the bot stopped and resume it.
+        
+        State comes from the game row, its session snapshot and
+        game_player_score. The game continues from its saved position; the
+        question that was interrupted is asked again.
+        """
+        game_chat_id = game['chat_id']
+        if not self._reserve(game_chat_id):
+            return False
+        
+        try:
+            session = await self._create_session(game, game.get('origin_chat_id') or game_chat_id, bot)
+            if not session:
+                return False
+            
+            # The snapshot carries the in-memory state and the position after the
+            # last finished question. The game row and game_player_score stay
+            # authoritative for what they also store, and current_position wins
+            # if it is further on: scoring a question moves it past that
+            # question in the same transaction, so committed scores are never
+            # replayed.
+            position = await games.get_current_position(game_chat_id)
+            saved_position = apply_snapshot(session, game.get('session_snapshot') or b'')
+            if saved_position is None:
+                saved_position = (0, 0)
+            session.current_theme_idx, session.current_question_idx = max(
+                saved_position, (position['theme'], position['question'])
+            )
+            session.spectators = list(game.get('spectators') or [])
+            
+            scores = await games.get_game_player_scores(game_chat_id)
+            player_telegram_data = await players.get_players_telegram_ids(list(scores))
+            telegram_ids = {p['id']: p['telegram_id'] for p in player_telegram_data}
+            for player_id, row in scores.items():
+                if session.player_abs_scores is not None:
+                    session.player_abs_scores[player_id] = row['abs_score']
+                telegram_id = telegram_ids.get(player_id)
+                if telegram_id is None:
+                    continue
+                if session.player_correct_answers is not None:
+                    session.player_correct_answers[telegram_id] = row['correct']
+                if session.player_wrong_answers is not None:
+                    session.player_wrong_answers[telegram_id] = row['wrong']
+            
+            self._sessions[game_chat_id] = session
+            
+            outbox.send(
+                bot,
+                game_chat_id,
+                messages.msg_game_resumed(session.current_theme_idx + 1, session.current_question_idx + 1),
+                priority=Priority.GAME
+            )
+            
+            from .game_loop import game_loop
+            session.task = asyncio.create_task(game_loop(session, bot))
+            return True
+        finally:
+            self._starting.discard(game_chat_id)
+    
+    async def restore_all(self, bot: Bot) -> int:
+        """Resume every game left running by the previous process. Returns how many resumed."""
+        try:
+            running = await games.get_running_games()
+        except Exception as e:
+            print(f"[RESTORE] Failed to load running games: {e}")
+            return 0
         
-        if game.get('game_mode') == 'private' and game.get('invite_link'):
+        restored = 0
+        for game in running:
             try:
-                await bot.revoke_chat_invite_link(game_chat_id, game['invite_link'])
-            except Exception:
-                pass
+                if await self.restore(game, bot):
+                    restored += 1
+            except Exception as e:
+                print(f"[RESTORE] Failed to resume game in chat {game['chat_id']}: {e}")
         
-        from .game_loop import game_loop
-        session.task = asyncio.create_task(game_loop(session, bot))
+        if restored:
+            print(f"[RESTORE] Resumed {restored} running games")
+        return restored
     
     async def stop(self, game_chat_id: int) -> None:
         session = self._sessions.get(game_chat_id)
@@ -83,13 +186,30 @@ class SessionManager:
         self._sessions.clear()
     
     async def finalize_all(self, bot: Bot, is_aborted: bool = False) -> None:
-        from .end_game import finalize_game
+        from .end_game import finalize_game, pack_history_entries
         
         chat_ids = list(self._sessions.keys())
         
+        # Write the pack history of every game in one upsert up front
+        history_entries: list[tuple[UUID, UUID, list[int]]] = []
+        for chat_id in chat_ids:
+            session = self._sessions.get(chat_id)
+            game = await games.get_game_by_chat_id(chat_id)
+            if not session or not game or game['status'] == GameStatus.REGISTERED.value:
+                continue
+            pack = await packs.get_pack_info(game['pack_short_name'])
+            if pack:
+                history_entries += pack_history_entries(
+                    session, pack['id'], session.players + (session.spectators or []), up_to_current=is_aborted
+                )
+        try:
+            await packs.update_player_pack_histories(history_entries)
+        except Exception as e:
+            print(f"[PACK HISTORY] Bulk write failed: {e}")
+        
         for chat_id in chat_ids:
             try:
-                await finalize_game(chat_id, bot, is_aborted=is_aborted)
+                await finalize_game(chat_id, bot, is_aborted=is_aborted, save_history=False)
             except Exception:
                 pass
         
@@ -164,7 +284,7 @@ class SessionManager:
     
     def pause(self, game_chat_id: int) -> bool:
         session = self._sessions.get(game_chat_id)
-        if not session or not session.pause_event:
+        if not session:
             return False
         
         if session.state == GameState.PAUSED:
@@ -175,22 +295,23 @@ class SessionManager:
         
         session.state_before_pause = session.state
         session.state = GameState.PAUSED
-        session.pause_event.clear()
+        session.timer.pause()
         return True
     
     def resume(self, game_chat_id: int) -> bool:
         session = self._sessions.get(game_chat_id)
-        if not session or not session.pause_event:
+        if not session:
             return False
         
         if session.state != GameState.PAUSED:
             return False
         
         session.state = session.state_before_pause
-        session.pause_event.set()
+        session.timer.resume()
         return True
     
     def remove(self, game_chat_id: int) -> None:
+        snapshot_writer.discard(game_chat_id)
         if game_chat_id in self._sessions:
             del self._sessions[game_chat_id]
 
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import zlib
+from typing import Any, Callable
+from uuid import UUID
+
+from database import games
+from .types import GameSession
+
+# First byte of every snapshot; bump it when the layout changes and keep a
+# reader for the old version so games saved before a deploy still restore.
+SNAPSHOT_VERSION = 1
+
+
+def encode_snapshot(session: GameSession, position: tuple[int, int]) -> bytes:
+    """Serialize the session state that lives only in memory.
+
+    position is the (theme, question) the game continues from.
+    """
+    state = {
+        'pos': list(position),
+        'abs': {str(k): v for k, v in (session.player_abs_scores or {}).items()},
+        'ok': {str(k): v for k, v in (session.player_correct_answers or {}).items()},
+        'bad': {str(k): v for k, v in (session.player_wrong_answers or {}).items()},
+        'pauses': {str(k): v for k, v in (session.player_pauses or {}).items()},
+        'start': {str(k): v for k, v in (session.player_start_theme_idx or {}).items()},
+        'kicked': sorted(session.kicked_players or ()),
+        'spect': [str(p) for p in session.spectators or ()],
+        'partial': session.partial_display_enabled,
+    }
+    payload = json.dumps(state, separators=(',', ':')).encode()
+    return bytes([SNAPSHOT_VERSION]) + zlib.compress(payload)
+
+
+def _restore_v1(session: GameSession, state: dict[str, Any]) -> tuple[int, int]:
+    session.player_abs_scores = {UUID(k): v for k, v in state['abs'].items()}
+    session.player_correct_answers = {int(k): v for k, v in state['ok'].items()}
+    session.player_wrong_answers = {int(k): v for k, v in state['bad'].items()}
+    session.player_pauses = {int(k): v for k, v in state['pauses'].items()}
+    session.player_start_theme_idx = {UUID(k): v for k, v in state['start'].items()}
+    session.kicked_players = set(state['kicked']) or None
+    session.spectators = [UUID(p) for p in state['spect']]
+    session.partial_display_enabled = state['partial']
+    theme, question = state['pos']
+    return theme, question
+
+
+_READERS: dict[int, Callable[[GameSession, dict[str, Any]], tuple[int, int]]] = {
+    1: _restore_v1,
+}
+
+
+def apply_snapshot(session: GameSession, snapshot: bytes) -> tuple[int, int] | None:
+    """Restore session state from a snapshot. Returns the saved position, None if unreadable."""
+    if not snapshot:
+        return None
+
+    reader = _READERS.get(snapshot[0])
+    if reader is None:
+        print(f"[SNAPSHOT] Chat {session.game_chat_id}: unknown snapshot version {snapshot[0]}")
+        return None
+
+    try:
+        state = json.loads(zlib.decompress(snapshot[1:]))
+        return reader(session, state)
+    except (zlib.error, ValueError, KeyError, TypeError) as e:
+        print(f"[SNAPSHOT] Chat {session.game_chat_id}: corrupt snapshot: {e}")
+        return None
+
+
+class SnapshotWriter:
+    """Writes session snapshots in the background, at most one in flight per game.
+
+    save() only records that a snapshot is due, so the game loop never waits
+    on the database. Saves requested while a write is running collapse into
+    one more write of the latest state.
+    """
+
+    def __init__(self) -> None:
+        self._due: dict[int, tuple[GameSession, tuple[int, int]]] = {}
+        self._writers: dict[int, asyncio.Task] = {}
+
+    def save(self, session: GameSession, theme: int, question: int) -> None:
+        chat_id = session.game_chat_id
+        self._due[chat_id] = (session, (theme, question))
+        if chat_id not in self._writers:
+            self._writers[chat_id] = asyncio.create_task(self._write(chat_id))
+
+    def discard(self, chat_id: int) -> None:
+        """Drop a pending snapshot of a game that is over."""
+        self._due.pop(chat_id, None)
+
+    async def _write(self, chat_id: int) -> None:
+        try:
+            while chat_id in self._due:
+                session, position = self._due.pop(chat_id)
+                try:
+                    await games.set_session_snapshot(chat_id, encode_snapshot(session, position))
+                except Exception as e:
+                    print(f"[SNAPSHOT] Chat {chat_id}: write failed: {e}")
+        finally:
+            del self._writers[chat_id]
+
+    async def flush_all(self) -> None:
+        """Wait until every due snapshot is written (on shutdown)."""
+        while self._writers:
+            await asyncio.gather(*self._writers.values(), return_exceptions=True)
+
+
+snapshot_writer = SnapshotWriter()
@@ -0,0 +1,242 @@
+import asyncio
+import heapq
+import itertools
+from collections import Counter
+from typing import Any, Callable
+
+
+class TimerHandle:
+    """A scheduled callback. cancel() is O(1): the entry is dropped lazily by the driver."""
+
+    __slots__ = ('when', 'kind', '_callback', '_service', '_cancelled', '_done')
+
+    def __init__(self, when: float, kind: str, callback: Callable[[], Any], service: "TimerService") -> None:
+        self.when = when
+        self.kind = kind
+        self._callback = callback
+        self._service = service
+        self._cancelled = False
+        self._done = False
+
+    def cancel(self) -> bool:
+        if self._cancelled or self._done:
+            return False
+        self._cancelled = True
+        self._service._on_cancel(self)
+        return True
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+
+class TimerService:
+    """One process-wide min-heap of deadlines, driven by a single task.
+    
+    Game loops, answer timeouts, dispute auto-apply and periodic jobs all
+    schedule here instead of each owning a sleeping task. The driver sleeps
+    until the earliest deadline. Callbacks returning a coroutine run it as a
+    task only once they fire.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, TimerHandle]] = []
+        self._seq = itertools.count()
+        self._pending: Counter[str] = Counter()
+        self._cancelled_in_heap = 0
+        self._wakeup: asyncio.Event | None = None
+        self._driver: asyncio.Task | None = None
+        self._running_callbacks: set[asyncio.Task] = set()
+
+    def schedule(self, delay: float, callback: Callable[[], Any], kind: str = "other") -> TimerHandle:
+        loop = asyncio.get_running_loop()
+        handle = TimerHandle(loop.time() + max(0.0, delay), kind, callback, self)
+        heapq.heappush(self._heap, (handle.when, next(self._seq), handle))
+        self._pending[kind] += 1
+        
+        if self._driver is None or self._driver.done():
+            self._wakeup = asyncio.Event()
+            self._driver = loop.create_task(self._run())
+        elif self._heap[0][2] is handle and self._wakeup:
+            self._wakeup.set()
+        return handle
+
+    async def sleep(self, delay: float, kind: str = "sleep") -> None:
+        future = asyncio.get_running_loop().create_future()
+        
+        def wake() -> None:
+            if not future.done():
+                future.set_result(None)
+        
+        handle = self.schedule(delay, wake, kind)
+        try:
+            await future
+        finally:
+            handle.cancel()
+
+    def pending_counts(self) -> dict[str, int]:
+        return {kind: count for kind, count in self._pending.items() if count > 0}
+
+    def _on_cancel(self, handle: TimerHandle) -> None:
+        self._pending[handle.kind] -= 1
+        self._cancelled_in_heap += 1
+        # Rebuild once dead entries dominate, so cancelled timers don't pile up
+        if self._cancelled_in_heap > 64 and self._cancelled_in_heap * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if not entry[2]._cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled_in_heap = 0
+
+    def _fire(self, handle: TimerHandle) -> None:
+        handle._done = True
+        self._pending[handle.kind] -= 1
+        try:
+            result = handle._callback()
+        except Exception as e:
+            print(f"[TIMER] {handle.kind} callback failed: {e}")
+            return
+        if asyncio.iscoroutine(result):
+            task = asyncio.get_running_loop().create_task(result)
+            self._running_callbacks.add(task)
+            task.add_done_callback(self._callback_done)
+
+    def _callback_done(self, task: asyncio.Task) -> None:
+        self._running_callbacks.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"[TIMER] Timer task failed: {task.exception()}")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        wakeup = self._wakeup
+        assert wakeup is not None
+        while True:
+            wakeup.clear()
+            
+            while self._heap and self._heap[0][2]._cancelled:
+                heapq.heappop(self._heap)
+                self._cancelled_in_heap -= 1
+            
+            if not self._heap:
+                await wakeup.wait()
+                continue
+            
+            when, _, handle = self._heap[0]
+            delay = when - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            heapq.heappop(self._heap)
+            self._fire(handle)
+
+
+timer_service = TimerService()
+
+
+class PausableTimer:
+    """Countdown for a session's waits on the monotonic clock, frozen while paused.
+
+    The timer owns the session's pause_event: pause() and resume() shift the
+    running deadline by exactly the time spent paused. A wait sleeps until its
+    deadline or until the timer changes (pause, resume, set_remaining, extend,
+    shorten, notify), never on a fixed tick.
+    """
+
+    def __init__(self, pause_event: asyncio.Event) -> None:
+        self._pause_event = pause_event
+        self._changed = asyncio.Event()
+        self._deadline: float | None = None
+        self._paused_at: float | None = None
+        self._pending: float | None = None
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused_at is not None
+
+    def remaining(self) -> float | None:
+        """Seconds left in the current wait, None when no wait is running."""
+        if self._deadline is None:
+            return None
+        now = self._paused_at if self._paused_at is not None else self._now()
+        return max(0.0, self._deadline - now)
+
+    def pause(self) -> None:
+        if self._paused_at is not None:
+            return
+        self._paused_at = self._now()
+        self._pause_event.clear()
+        self._changed.set()
+
+    def resume(self) -> None:
+        if self._paused_at is None:
+            return
+        if self._deadline is not None:
+            self._deadline += self._now() - self._paused_at
+        self._paused_at = None
+        self._pause_event.set()
+        self._changed.set()
+
+    def set_remaining(self, seconds: float) -> None:
+        """Restart the running wait with seconds left.
+        
+        Applied when the wait next wakes up while not paused. If that wait ends
+        for another reason first (or none is running), the next wait lasts
+        seconds instead of its own duration.
+        """
+        self._pending = seconds
+        self._changed.set()
+
+    def extend(self, seconds: float) -> None:
+        """Add seconds to the running wait, if any."""
+        if self._deadline is not None:
+            self._deadline += seconds
+            self._changed.set()
+
+    def shorten(self, seconds: float) -> None:
+        """Take seconds off the running wait, if any."""
+        self.extend(-seconds)
+
+    def notify(self) -> None:
+        """Make the running wait re-check its until() condition."""
+        self._changed.set()
+
+    async def wait(self, seconds: float, until: Callable[[], bool] | None = None) -> bool:
+        """Wait seconds of unpaused time. Returns True if until() became true first.
+        
+        until is checked whenever the timer changes or notify() is called. The
+        deadline and every change set the same event, so a wait creates no tasks.
+        """
+        start = self._paused_at if self._paused_at is not None else self._now()
+        self._deadline = start + seconds
+        try:
+            while True:
+                self._changed.clear()
+                
+                if self._paused_at is not None:
+                    # resume() moves the deadline by the paused time
+                    await self._pause_event.wait()
+                    continue
+                
+                if until is not None and until():
+                    return True
+                
+                if self._pending is not None:
+                    self._deadline = self._now() + self._pending
+                    self._pending = None
+                
+                remaining = self._deadline - self._now()
+                if remaining <= 0:
+                    return False
+                
+                deadline_timer = timer_service.schedule(remaining, self._changed.set, "game")
+                try:
+                    await self._changed.wait()
+                finally:
+                    deadline_timer.cancel()
+        finally:
+            self._deadline = None
@@ -1,8 +1,12 @@
 import asyncio
 from enum import Enum
 from dataclasses import dataclass
+from typing import Any, Mapping
 from uuid import UUID
 
+from .reveal import QuestionReveal
+from .timer import PausableTimer
+
 
 class GameState(Enum):
     IDLE = "idle"
@@ -35,11 +39,13 @@ class GameSession:
     game_chat_id: int
     origin_chat_id: int
 
-    pack_file: dict
+    pack_file: Mapping[str, Any]
     pack_themes: list[int]
 
     players: list[UUID]
 
+    timer: PausableTimer
+
     state: GameState = GameState.IDLE
     state_before_pause: GameState = GameState.IDLE
 
@@ -63,7 +69,6 @@ class GameSession:
     player_abs_scores: dict[UUID, int] | None = None
     invite_link: str | None = None
     player_start_theme_idx: dict[UUID, int] | None = None
-    timer_extension: float = 0.0
     dispute_poll_id: str | None = None
     dispute_player_id: int | None = None
     dispute_votes: dict[int, bool] | None = None
@@ -80,6 +85,7 @@ class GameSession:
     partial_display_enabled: bool = False
     current_question_parts: list[str] | None = None
     current_part_index: int = 0
+    question_reveal: QuestionReveal | None = None
     
     # Pauses per game (per player telegram_id)
     player_pauses: dict[int, int] | None = None
@@ -89,7 +95,7 @@ class GameSession:
         cls,
         game_chat_id: int,
         origin_chat_id: int,
-        pack_file: dict,
+        pack_file: Mapping[str, Any],
         pack_themes: list[int],
         players: list[UUID],
         invite_link: str | None = None,
@@ -109,10 +115,14 @@ class GameSession:
             players=players,
             pause_event=pause_event,
             answer_event=answer_event,
+            timer=PausableTimer(pause_event),
             player_correct_answers={},
             player_wrong_answers={},
             player_abs_scores={},
             invite_link=invite_link,
             player_start_theme_idx=player_start_theme_idx,
         )
-
+    
+    def set_timer_remaining(self, seconds: float) -> None:
+        """Restart the current (or next) wait of the game loop with seconds left."""
+        self.timer.set_remaining(seconds)
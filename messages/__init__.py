@@ -1,6 +1,7 @@
 from messages.welcome import build_welcome_message
 from messages.stats import build_stats_message
 from messages.game_info import build_game_info_message
+from messages.pack_list import build_pack_list_message
 from messages.game_messages import (
     msg_pack_not_found,
     msg_current_scores,
@@ -16,6 +17,7 @@ from messages.game_messages import (
     msg_error,
     msg_all_players_joined,
     msg_game_cancelled_inactivity,
+    msg_game_resumed,
     msg_time_up,
     msg_player_answering,
     msg_question_hidden,
@@ -28,6 +30,7 @@ __all__ = [
     "build_welcome_message",
     "build_stats_message",
     "build_game_info_message",
+    "build_pack_list_message",
     "msg_pack_not_found",
     "msg_current_scores",
     "msg_pack_info",
@@ -42,6 +45,7 @@ __all__ = [
     "msg_error",
     "msg_all_players_joined",
     "msg_game_cancelled_inactivity",
+    "msg_game_resumed",
     "msg_time_up",
     "msg_player_answering",
     "msg_question_hidden",
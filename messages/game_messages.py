@@ -61,6 +61,10 @@ def msg_game_cancelled_inactivity() -> str:
     return "Игра отменена из-за неактивности."
 
 
+def msg_game_resumed(theme_number: int, question_number: int) -> str:
+    return f"♻️ Бот перезапущен. Игра продолжается: тема {theme_number}, вопрос {question_number}."
+
+
 def msg_time_up(player_name: str) -> str:
     return f"Время вышло! {player_name} не успел ответить."
 
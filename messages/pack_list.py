@@ -0,0 +1,27 @@
+import html
+
+
+def build_pack_list_message(
+    pack_page: list[dict],
+    query: str | None,
+    page: int,
+    fresh_themes: dict[str, int] | None = None,
+) -> str:
+    if query:
+        header = f"📦 <b>Паки по запросу «{html.escape(query)}»</b>"
+    else:
+        header = "📦 <b>Доступные паки:</b>"
+    if page > 0:
+        header += f" (стр. {page + 1})"
+    
+    if not pack_page:
+        return f"{header}\n\nНичего не найдено."
+    
+    pack_lines = []
+    for p in pack_page:
+        line = f"<code>{p['short_name']}</code> — {p['name']} ({p['number_of_themes']} тем)"
+        if fresh_themes is not None:
+            line += f", новых: {fresh_themes.get(p['short_name'], 0)}"
+        pack_lines.append(line)
+    
+    return f"{header}\n\n" + "\n".join(pack_lines)
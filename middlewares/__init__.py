@@ -4,7 +4,7 @@ from typing import Callable, Any
 from aiogram.types import Message
 
 from database.allowed_chat import is_chat_allowed
-from database.game_chats import get_game_by_game_chat
+from database.game_chats import is_game_chat
 
 __all__ = ["require_allowed_chat", "require_not_game_chat"]
 
@@ -46,7 +46,7 @@ def require_not_game_chat(handler: Callable) -> Callable:
         chat_id = message.chat.id
         
         # Check if this is a game chat
-        if await get_game_by_game_chat(chat_id):
+        if await is_game_chat(chat_id):
             # This is a game chat, don't allow registration commands
             return  # Silently ignore the command
         
@@ -0,0 +1,20 @@
+-- Per-player game scores, replacing the game.scores JSONB column
+CREATE TABLE IF NOT EXISTS game_player_score (
+    game_id UUID NOT NULL REFERENCES game(id) ON DELETE CASCADE,
+    player_id UUID NOT NULL REFERENCES player(id) ON DELETE CASCADE,
+    score INTEGER DEFAULT 0 NOT NULL,
+    abs_score INTEGER DEFAULT 0 NOT NULL,
+    correct INTEGER DEFAULT 0 NOT NULL,
+    wrong INTEGER DEFAULT 0 NOT NULL,
+    PRIMARY KEY (game_id, player_id)
+);
+
+-- Move scores of games in progress into the new table
+INSERT INTO game_player_score (game_id, player_id, score)
+SELECT g.id, p.id, s.value::INTEGER
+FROM game g
+CROSS JOIN jsonb_each_text(g.scores) AS s(key, value)
+JOIN player p ON p.id::TEXT = s.key
+ON CONFLICT (game_id, player_id) DO NOTHING;
+
+ALTER TABLE game DROP COLUMN IF EXISTS scores;
@@ -0,0 +1,32 @@
+-- Notify the bot about allowed_chat and game_chat changes so its in-memory
+-- chat registry stays in sync with edits made outside the bot
+CREATE OR REPLACE FUNCTION notify_chat_registry()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed RECORD;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+
+    PERFORM pg_notify(
+        'chat_registry',
+        json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'row', row_to_json(changed))::TEXT
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_allowed_chat_notify ON allowed_chat;
+CREATE TRIGGER trigger_allowed_chat_notify
+    AFTER INSERT OR UPDATE OR DELETE ON allowed_chat
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_chat_registry();
+
+DROP TRIGGER IF EXISTS trigger_game_chat_notify ON game_chat;
+CREATE TRIGGER trigger_game_chat_notify
+    AFTER INSERT OR UPDATE OR DELETE ON game_chat
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_chat_registry();
@@ -0,0 +1,3 @@
+-- Content version of a pack, bumped whenever pack_file is rewritten.
+-- Cached pack contents are keyed by (id, version).
+ALTER TABLE pack ADD COLUMN IF NOT EXISTS version INTEGER DEFAULT 1 NOT NULL;
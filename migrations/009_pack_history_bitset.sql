@@ -0,0 +1,37 @@
+-- Store played themes as a bit string instead of a comma-joined range string.
+-- Theme i is bit i counting from the left, so get_bit(themes_mask, i) = 1
+-- means theme i was played.
+ALTER TABLE player_pack_history ADD COLUMN IF NOT EXISTS themes_mask BIT VARYING DEFAULT B'' NOT NULL;
+
+-- Bitwise OR of bit strings of different lengths (the built-in | requires equal lengths)
+CREATE OR REPLACE FUNCTION varbit_or(a BIT VARYING, b BIT VARYING) RETURNS BIT VARYING
+LANGUAGE sql IMMUTABLE STRICT AS $$
+    SELECT rpad(a::TEXT, greatest(length(a), length(b)), '0')::BIT VARYING
+         | rpad(b::TEXT, greatest(length(a), length(b)), '0')::BIT VARYING
+$$;
+
+-- Convert existing "0-3,7,9-10" strings (possibly with duplicates)
+WITH played AS (
+    SELECT h.id,
+           generate_series(
+               split_part(btrim(raw.part), '-', 1)::INTEGER,
+               COALESCE(NULLIF(split_part(btrim(raw.part), '-', 2), ''), split_part(btrim(raw.part), '-', 1))::INTEGER
+           ) AS theme_index
+    FROM player_pack_history h
+    CROSS JOIN LATERAL regexp_split_to_table(h.themes_played, ',') AS raw(part)
+    WHERE btrim(raw.part) ~ '^\d+(-\d+)?$'
+),
+masks AS (
+    SELECT id, array_agg(DISTINCT theme_index) AS indices, max(theme_index) AS top
+    FROM played
+    GROUP BY id
+)
+UPDATE player_pack_history h
+SET themes_mask = (
+    SELECT string_agg(CASE WHEN i = ANY(m.indices) THEN '1' ELSE '0' END, '' ORDER BY i)
+    FROM generate_series(0, m.top) AS i
+)::BIT VARYING
+FROM masks m
+WHERE m.id = h.id;
+
+ALTER TABLE player_pack_history DROP COLUMN IF EXISTS themes_played;
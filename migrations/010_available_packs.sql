@@ -0,0 +1,12 @@
+-- OR of all bit strings in a group, for the themes a set of players has played
+DROP AGGREGATE IF EXISTS varbit_or_agg(BIT VARYING);
+CREATE AGGREGATE varbit_or_agg(BIT VARYING) (
+    SFUNC = varbit_or,
+    STYPE = BIT VARYING,
+    INITCOND = ''
+);
+
+-- UNIQUE(player_id, pack_id) already indexes the lookup; including the mask
+-- lets available-pack queries read histories with index-only scans.
+CREATE INDEX IF NOT EXISTS idx_player_pack_history_player_pack_mask
+    ON player_pack_history (player_id, pack_id) INCLUDE (themes_mask);
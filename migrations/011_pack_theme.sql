@@ -0,0 +1,29 @@
+-- Store pack themes one row each so a game loads only the themes it plays.
+-- pack.meta keeps everything from pack_file except the themes list.
+CREATE TABLE IF NOT EXISTS pack_theme (
+    pack_id UUID NOT NULL REFERENCES pack(id) ON DELETE CASCADE,
+    theme_index INTEGER NOT NULL,
+    content JSONB NOT NULL,
+    PRIMARY KEY (pack_id, theme_index)
+);
+
+ALTER TABLE pack ADD COLUMN IF NOT EXISTS meta JSONB DEFAULT '{}'::JSONB NOT NULL;
+
+INSERT INTO pack_theme (pack_id, theme_index, content)
+SELECT p.id, t.ord - 1, t.theme
+FROM pack p
+CROSS JOIN LATERAL jsonb_array_elements(COALESCE(p.pack_file->'themes', '[]'::JSONB)) WITH ORDINALITY AS t(theme, ord)
+ON CONFLICT (pack_id, theme_index) DO NOTHING;
+
+UPDATE pack SET meta = pack_file - 'themes';
+
+ALTER TABLE pack DROP COLUMN IF EXISTS pack_file;
+
+-- The old pack row shape, with pack_file reassembled from meta and themes
+CREATE OR REPLACE VIEW pack_with_file AS
+SELECT p.id, p.short_name, p.name, p.number_of_themes, p.version,
+       p.meta || jsonb_build_object('themes', COALESCE(
+           (SELECT jsonb_agg(t.content ORDER BY t.theme_index) FROM pack_theme t WHERE t.pack_id = p.id),
+           '[]'::JSONB
+       )) AS pack_file
+FROM pack p;
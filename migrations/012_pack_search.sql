@@ -0,0 +1,8 @@
+-- Trigram indexes for substring search over pack and theme names (/pack_list <query>)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_pack_name_trgm ON pack USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_pack_short_name_trgm ON pack USING gin (short_name gin_trgm_ops);
+
+ALTER TABLE pack_theme ADD COLUMN IF NOT EXISTS name TEXT GENERATED ALWAYS AS (content->>'name') STORED;
+CREATE INDEX IF NOT EXISTS idx_pack_theme_name_trgm ON pack_theme USING gin (name gin_trgm_ops);
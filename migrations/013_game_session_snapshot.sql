@@ -0,0 +1,23 @@
+-- In-memory session state of running games, restored after a bot restart.
+-- One version byte followed by zlib-compressed JSON (see game/snapshots.py).
+-- Kept in a narrow side table: it is rewritten after every question, and
+-- writing it to the game row would fire updated_at and rewrite the whole row.
+CREATE TABLE IF NOT EXISTS game_session_snapshot (
+    game_id UUID PRIMARY KEY REFERENCES game(id) ON DELETE CASCADE,
+    data BYTEA NOT NULL,
+    saved_at TIMESTAMPTZ DEFAULT NOW() NOT NULL
+);
+
+-- Databases that got the earlier game.session_snapshot column
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'game' AND column_name = 'session_snapshot'
+    ) THEN
+        INSERT INTO game_session_snapshot (game_id, data)
+        SELECT id, session_snapshot FROM game WHERE session_snapshot IS NOT NULL
+        ON CONFLICT (game_id) DO NOTHING;
+        ALTER TABLE game DROP COLUMN session_snapshot;
+    END IF;
+END $$;
@@ -0,0 +1,9 @@
+from .buckets import TokenBucket
+from .queue import Outbox, Priority, outbox
+
+__all__ = [
+    'TokenBucket',
+    'Outbox',
+    'Priority',
+    'outbox',
+]
@@ -0,0 +1,237 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.types import Message
+
+from .buckets import TokenBucket
+
+# Telegram allows about 20 messages per minute in a group, one per second in
+# a private chat and 30 per second across all chats.
+_GROUP_RATE_PER_MIN = float(os.getenv("OUTBOX_GROUP_RATE_PER_MIN", 20))
+_PRIVATE_RATE_PER_SEC = float(os.getenv("OUTBOX_PRIVATE_RATE_PER_SEC", 1))
+_GLOBAL_RATE_PER_SEC = float(os.getenv("OUTBOX_GLOBAL_RATE_PER_SEC", 30))
+_MAX_RETRIES = 5
+
+
+class Priority(IntEnum):
+    GAME = 0      # the game's own flow; sent in submission order
+    INFO = 1      # score tables, final results and other messages that may wait behind questions
+    CHATTER = 2   # confirmations and other replies
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    call: Callable[[], Awaitable[Any]] = field(compare=False)
+    futures: list[asyncio.Future] = field(compare=False)
+    key: str | None = field(default=None, compare=False)
+    attempts: int = field(default=0, compare=False)
+
+
+@dataclass
+class _ChatQueue:
+    bucket: TokenBucket
+    heap: list[_Job] = field(default_factory=list)
+    by_key: dict[str, _Job] = field(default_factory=dict)
+    blocked_until: float = 0.0
+    worker: asyncio.Task | None = None
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Fire-and-forget senders never await their future; don't warn about it
+    if not future.cancelled():
+        future.exception()
+
+
+class Outbox:
+    """Per-chat outbound queue in front of the Bot.
+
+    Calls for one chat run one at a time, highest priority first and in
+    submission order within a priority, paced by per-chat and global token
+    buckets. TelegramRetryAfter pauses the chat and retries the same call
+    instead of failing it. Every call returns a future with its result.
+    """
+
+    def __init__(self) -> None:
+        self._chats: dict[int, _ChatQueue] = {}
+        self._global = TokenBucket(_GLOBAL_RATE_PER_SEC, _GLOBAL_RATE_PER_SEC)
+        self._seq = itertools.count()
+
+    @staticmethod
+    def _new_bucket(chat_id: int) -> TokenBucket:
+        if chat_id > 0:
+            return TokenBucket(_PRIVATE_RATE_PER_SEC, 1)
+        return TokenBucket(_GROUP_RATE_PER_MIN / 60, _GROUP_RATE_PER_MIN)
+
+    def _queue(self, chat_id: int) -> _ChatQueue:
+        queue = self._chats.get(chat_id)
+        if queue is None:
+            queue = _ChatQueue(bucket=self._new_bucket(chat_id))
+            self._chats[chat_id] = queue
+        return queue
+
+    def submit(
+        self,
+        chat_id: int,
+        call: Callable[[], Awaitable[Any]],
+        priority: Priority = Priority.CHATTER,
+        key: str | None = None,
+    ) -> asyncio.Future:
+        """Queue call for chat_id.
+        
+        With a key, a still-queued call with the same key is replaced by this
+        one (its future resolves with this call's result), so only the latest
+        edit of a message is sent.
+        """
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        queue = self._queue(chat_id)
+        
+        pending = queue.by_key.get(key) if key else None
+        if pending is not None:
+            pending.call = call
+            pending.futures.append(future)
+            if priority < pending.priority:
+                pending.priority = priority
+                heapq.heapify(queue.heap)
+        else:
+            job = _Job(priority, next(self._seq), call, [future], key)
+            heapq.heappush(queue.heap, job)
+            if key:
+                queue.by_key[key] = job
+        
+        if queue.worker is None:
+            queue.worker = asyncio.create_task(self._drain(chat_id, queue))
+        return future
+
+    def send(self, bot: Bot, chat_id: int, text: str, priority: Priority = Priority.CHATTER, **kwargs: Any) -> asyncio.Future:
+        """bot.send_message through the queue; the future resolves to the sent Message."""
+        return self.submit(chat_id, lambda: bot.send_message(chat_id, text, **kwargs), priority)
+
+    def edit(
+        self,
+        bot: Bot,
+        chat_id: int,
+        message_id: int,
+        text: str,
+        priority: Priority = Priority.GAME,
+        key: str | None = None,
+        **kwargs: Any,
+    ) -> asyncio.Future:
+        """bot.edit_message_text through the queue, coalescing queued edits with the same key."""
+        return self.submit(
+            chat_id,
+            lambda: bot.edit_message_text(text=text, chat_id=chat_id, message_id=message_id, **kwargs),
+            priority,
+            key,
+        )
+
+    def reply(self, message: Message, text: str, priority: Priority = Priority.CHATTER, **kwargs: Any) -> asyncio.Future:
+        """message.answer through the queue."""
+        return self.submit(message.chat.id, lambda: message.answer(text, **kwargs), priority)
+
+    def cancel(self, chat_id: int, key: str) -> bool:
+        """Drop the still-queued call with key, cancelling its futures."""
+        queue = self._chats.get(chat_id)
+        job = queue.by_key.pop(key, None) if queue else None
+        if queue is None or job is None:
+            return False
+        queue.heap.remove(job)
+        heapq.heapify(queue.heap)
+        for future in job.futures:
+            future.cancel()
+        return True
+
+    def budget(self, chat_id: int) -> float:
+        """Calls chat_id can take right now without waiting, after what is already queued."""
+        queue = self._chats.get(chat_id)
+        if queue is None:
+            return self._new_bucket(chat_id).capacity
+        now = time.monotonic()
+        if queue.blocked_until > now:
+            return 0.0
+        queue.bucket.delay(now)  # refill
+        return queue.bucket.tokens - len(queue.heap)
+
+    def pending_counts(self) -> dict[str, int]:
+        counts = {priority.name: 0 for priority in Priority}
+        for queue in self._chats.values():
+            for job in queue.heap:
+                counts[Priority(job.priority).name] += 1
+        return counts
+
+    async def _wait_for_slot(self, queue: _ChatQueue) -> None:
+        """Sleep until the chat may send; the caller takes the tokens."""
+        while True:
+            now = time.monotonic()
+            delay = max(queue.blocked_until - now, queue.bucket.delay(now), self._global.delay(now))
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    async def _drain(self, chat_id: int, queue: _ChatQueue) -> None:
+        try:
+            while queue.heap:
+                # Jobs stay queued (replaceable and cancellable) until a slot is granted
+                await self._wait_for_slot(queue)
+                if not queue.heap:
+                    break
+                
+                job = heapq.heappop(queue.heap)
+                if job.key and queue.by_key.get(job.key) is job:
+                    del queue.by_key[job.key]
+                now = time.monotonic()
+                queue.bucket.take(now)
+                self._global.take(now)
+                
+                try:
+                    result = await job.call()
+                except TelegramRetryAfter as e:
+                    job.attempts += 1
+                    queue.blocked_until = time.monotonic() + e.retry_after
+                    print(f"[OUTBOX] Flood limit in chat {chat_id}, retrying in {e.retry_after}s")
+                    if job.attempts > _MAX_RETRIES:
+                        self._resolve(job, exception=e)
+                        continue
+                    newer = queue.by_key.get(job.key) if job.key else None
+                    if newer is not None:
+                        # A newer edit superseded this one while it was in flight
+                        newer.futures.extend(job.futures)
+                        continue
+                    heapq.heappush(queue.heap, job)
+                    if job.key:
+                        queue.by_key[job.key] = job
+                    continue
+                except Exception as e:
+                    self._resolve(job, exception=e)
+                    continue
+                
+                self._resolve(job, result=result)
+        finally:
+            queue.worker = None
+            # Forget idle chats only once their limits have fully recovered
+            now = time.monotonic()
+            if not queue.heap and queue.blocked_until <= now and queue.bucket.full(now):
+                self._chats.pop(chat_id, None)
+
+    @staticmethod
+    def _resolve(job: _Job, result: Any = None, exception: BaseException | None = None) -> None:
+        for future in job.futures:
+            if future.done():
+                continue
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+
+
+outbox = Outbox()
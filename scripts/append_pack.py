@@ -28,7 +28,7 @@ load_dotenv()
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import Database
-from database.packs import get_pack_by_short_name, create_pack
+from database.packs import get_pack_info, create_pack, append_pack_themes
 
 REQUIRED_QUESTION_FIELDS = ['form', 'cost', 'question', 'answer']
 QUESTIONS_PER_THEME = 5
@@ -104,16 +104,6 @@ def validate_json(data: dict) -> list[str]:
     return errors
 
 
-async def update_pack(short_name: str, pack_file: dict, number_of_themes: int) -> bool:
-    """Update pack in database."""
-    pool = Database.get_pool()
-    sql = Database.load_sql("packs/update_pack.sql")
-    
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(sql, short_name, json.dumps(pack_file), number_of_themes)
-        return row is not None
-
-
 async def main():
     parser = argparse.ArgumentParser(
         description='Append themes from JSON file to existing pack in database',
@@ -168,7 +158,7 @@ Example:
     try:
         # Get existing pack
         print(f"📦 Loading pack '{args.pack_short_name}'...")
-        existing_pack = await get_pack_by_short_name(args.pack_short_name)
+        existing_pack = await get_pack_info(args.pack_short_name)
         
         if not existing_pack:
             # Pack doesn't exist - check if we can create it
@@ -209,39 +199,28 @@ Example:
             print(f"   Short name: {args.pack_short_name}")
             print(f"   Themes: {total_themes}")
         else:
-            # Pack exists - append themes
-            existing_pack_file = existing_pack['pack_file']
-            existing_themes = existing_pack_file.get('themes', [])
-            existing_count = len(existing_themes)
+            # Pack exists - append themes server-side, existing ones are never downloaded
+            existing_count = existing_pack['number_of_themes']
             
             print(f"✅ Found pack with {existing_count} existing theme(s)")
             
-            # Concatenate themes
-            merged_themes = existing_themes + new_themes
-            total_themes = len(merged_themes)
-            
-            # Create updated pack file
-            updated_pack_file = existing_pack_file.copy()
-            updated_pack_file['themes'] = merged_themes
-            
-            print(f"\n📊 Result: {existing_count} + {len(new_themes)} = {total_themes} theme(s)")
+            print(f"\n📊 Result: {existing_count} + {len(new_themes)} = {existing_count + len(new_themes)} theme(s)")
             
             if args.dry_run:
                 print("\n🔍 Dry run - no changes made to database")
-                print("\n--- Merged pack structure ---")
-                for i, theme in enumerate(merged_themes, 1):
-                    marker = "📗" if i <= existing_count else "📘"
-                    print(f"   {marker} {i}. {theme['name']}")
+                print("\n--- Themes to append ---")
+                for i, theme in enumerate(new_themes, existing_count + 1):
+                    print(f"   📘 {i}. {theme['name']}")
                 return
             
-            # Update in database
-            print(f"\n💾 Updating pack in database...")
-            success = await update_pack(args.pack_short_name, updated_pack_file, total_themes)
+            # Append in database
+            print(f"\n💾 Appending themes in database...")
+            result = await append_pack_themes(args.pack_short_name, new_themes)
             
-            if success:
+            if result:
                 print(f"\n✅ Pack updated successfully!")
                 print(f"   Short name: {args.pack_short_name}")
-                print(f"   Total themes: {total_themes}")
+                print(f"   Total themes: {result['number_of_themes']}")
             else:
                 print(f"\n❌ Error: Failed to update pack")
                 sys.exit(1)
@@ -0,0 +1,3 @@
+-- Get all game chats with their assigned game (if any)
+SELECT id, chat_id, game_id
+FROM game_chat;
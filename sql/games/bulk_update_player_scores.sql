@@ -1,7 +1,21 @@
--- Bulk update player scores in a game
+-- Add score deltas to the per-player score rows of a game
 -- $1: chat_id
--- $2: new_scores (JSONB) - complete scores object to replace
-UPDATE game
-SET scores = $2
-WHERE chat_id = $1;
-
+-- $2: player_ids (UUID[])
+-- $3: score deltas (INTEGER[])
+-- $4: abs_score deltas (INTEGER[])
+-- $5: correct answer deltas (INTEGER[])
+-- $6: wrong answer deltas (INTEGER[])
+-- Rows are locked by ON CONFLICT DO UPDATE and incremented in place, so
+-- concurrent writers never lose updates.
+INSERT INTO game_player_score AS gps (game_id, player_id, score, abs_score, correct, wrong)
+SELECT g.id, d.player_id, d.score, d.abs_score, d.correct, d.wrong
+FROM game g
+CROSS JOIN unnest($2::UUID[], $3::INTEGER[], $4::INTEGER[], $5::INTEGER[], $6::INTEGER[])
+    AS d(player_id, score, abs_score, correct, wrong)
+WHERE g.chat_id = $1
+ON CONFLICT (game_id, player_id) DO UPDATE SET
+    score = gps.score + EXCLUDED.score,
+    abs_score = gps.abs_score + EXCLUDED.abs_score,
+    correct = gps.correct + EXCLUDED.correct,
+    wrong = gps.wrong + EXCLUDED.wrong
+RETURNING gps.player_id, gps.score, gps.abs_score, gps.correct, gps.wrong;
@@ -1,6 +1,5 @@
--- Get scores for a game
-SELECT scores
-FROM game
-WHERE chat_id = $1;
-
-
+-- Get per-player scores for a game
+SELECT gps.player_id, gps.score, gps.abs_score, gps.correct, gps.wrong
+FROM game_player_score gps
+JOIN game g ON g.id = gps.game_id
+WHERE g.chat_id = $1;
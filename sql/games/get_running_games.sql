@@ -0,0 +1,5 @@
+-- Get games that were running when the bot stopped, with their session snapshots
+SELECT g.*, s.data AS session_snapshot
+FROM game g
+LEFT JOIN game_session_snapshot s ON s.game_id = g.id
+WHERE g.status = 'running';
@@ -0,0 +1,8 @@
+-- Save the session snapshot of a running game
+-- $1: chat_id
+-- $2: snapshot
+INSERT INTO game_session_snapshot (game_id, data, saved_at)
+SELECT id, $2, NOW() FROM game WHERE chat_id = $1
+ON CONFLICT (game_id) DO UPDATE SET
+    data = EXCLUDED.data,
+    saved_at = EXCLUDED.saved_at;
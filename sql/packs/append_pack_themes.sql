@@ -0,0 +1,22 @@
+-- Append themes to the end of a pack without touching existing ones
+-- $1: short_name
+-- $2: themes (JSONB array)
+-- The pack row is locked first, so concurrent appends to the same pack
+-- queue up and each sees the number_of_themes left by the previous one.
+WITH locked AS (
+    SELECT id, number_of_themes
+    FROM pack
+    WHERE short_name = $1
+    FOR UPDATE
+),
+inserted AS (
+    INSERT INTO pack_theme (pack_id, theme_index, content)
+    SELECT locked.id, locked.number_of_themes + t.ord - 1, t.theme
+    FROM locked
+    CROSS JOIN LATERAL jsonb_array_elements($2::JSONB) WITH ORDINALITY AS t(theme, ord)
+)
+UPDATE pack p
+SET number_of_themes = locked.number_of_themes + jsonb_array_length($2::JSONB)
+FROM locked
+WHERE p.id = locked.id
+RETURNING p.id, p.number_of_themes;
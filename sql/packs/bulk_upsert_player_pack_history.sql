@@ -0,0 +1,9 @@
+-- Insert or update pack history for many players at once
+-- $1: player_ids (UUID[])
+-- $2: pack_ids (UUID[])
+-- $3: themes_masks (TEXT[]) - bit strings of played themes to add, theme i at position i
+INSERT INTO player_pack_history (player_id, pack_id, themes_mask)
+SELECT h.player_id, h.pack_id, h.themes_mask::BIT VARYING
+FROM unnest($1::UUID[], $2::UUID[], $3::TEXT[]) AS h(player_id, pack_id, themes_mask)
+ON CONFLICT (player_id, pack_id) DO UPDATE SET
+    themes_mask = varbit_or(player_pack_history.themes_mask, EXCLUDED.themes_mask);
@@ -1,5 +1,17 @@
--- Create a new question pack
-INSERT INTO pack (short_name, name, pack_file, number_of_themes)
-VALUES ($1, $2, $3, $4)
-RETURNING id;
-
+-- Create a new question pack with its themes
+-- $1: short_name, $2: name
+-- $3: meta (JSONB) - pack_file without the themes list
+-- $4: themes (JSONB array)
+-- $5: number_of_themes
+WITH new_pack AS (
+    INSERT INTO pack (short_name, name, meta, number_of_themes)
+    VALUES ($1, $2, $3, $5)
+    RETURNING id
+),
+new_themes AS (
+    INSERT INTO pack_theme (pack_id, theme_index, content)
+    SELECT new_pack.id, t.ord - 1, t.theme
+    FROM new_pack
+    CROSS JOIN LATERAL jsonb_array_elements($4::JSONB) WITH ORDINALITY AS t(theme, ord)
+)
+SELECT id FROM new_pack;
@@ -1,3 +1,4 @@
--- Get all available packs
-SELECT * FROM pack ORDER BY short_name;
-
+-- Get the pack catalog (without pack_file contents)
+SELECT id, short_name, name, number_of_themes, version
+FROM pack
+ORDER BY short_name;
@@ -0,0 +1,22 @@
+-- Get packs with at least $2 themes that none of the given players has played
+-- $1: player_ids (UUID[])
+-- $2: themes_needed (INTEGER)
+WITH played AS (
+    SELECT pph.pack_id, varbit_or_agg(pph.themes_mask) AS mask
+    FROM player_pack_history pph
+    WHERE pph.player_id = ANY($1)
+    GROUP BY pph.pack_id
+)
+SELECT p.id, p.short_name, p.name, p.number_of_themes,
+       count(*)::INTEGER AS available_themes_count,
+       array_agg(t.theme_index ORDER BY t.theme_index) AS available_theme_indices
+FROM pack p
+LEFT JOIN played pl ON pl.pack_id = p.id
+CROSS JOIN LATERAL generate_series(0, p.number_of_themes - 1) AS t(theme_index)
+WHERE CASE
+    WHEN pl.mask IS NULL OR t.theme_index >= length(pl.mask) THEN TRUE
+    ELSE get_bit(pl.mask, t.theme_index) = 0
+END
+GROUP BY p.id
+HAVING count(*) >= $2
+ORDER BY available_themes_count DESC, p.short_name;
@@ -1,3 +1,2 @@
--- Get pack by short name
-SELECT * FROM pack WHERE short_name = $1;
-
+-- Get pack by short name, with pack_file reassembled from its themes
+SELECT * FROM pack_with_file WHERE short_name = $1;
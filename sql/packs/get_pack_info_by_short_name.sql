@@ -0,0 +1,4 @@
+-- Get pack catalog entry by short name (without pack_file contents)
+SELECT id, short_name, name, number_of_themes, version
+FROM pack
+WHERE short_name = $1;
@@ -0,0 +1,9 @@
+-- Get pack meta, version and selected themes by pack ID, one row per theme
+-- (a single row with NULL theme when none of the themes exist)
+-- $1: pack_id (UUID)
+-- $2: theme_indices (INTEGER[])
+SELECT p.meta, p.version, t.theme_index, t.content
+FROM pack p
+LEFT JOIN pack_theme t ON t.pack_id = p.id AND t.theme_index = ANY($2::INTEGER[])
+WHERE p.id = $1
+ORDER BY t.theme_index;
@@ -0,0 +1,8 @@
+-- Get one page of the pack catalog, keyset-paginated by short_name
+-- $1: short_name of the last pack on the previous page ('' for the first page)
+-- $2: page size
+SELECT id, short_name, name, number_of_themes, version
+FROM pack
+WHERE short_name > $1
+ORDER BY short_name
+LIMIT $2;
@@ -0,0 +1,15 @@
+-- Search packs by pack name, short name or theme name, keyset-paginated by short_name
+-- $1: ILIKE pattern (already escaped, e.g. '%query%')
+-- $2: short_name of the last pack on the previous page ('' for the first page)
+-- $3: page size
+WITH matches AS (
+    SELECT id AS pack_id FROM pack WHERE name ILIKE $1 OR short_name ILIKE $1
+    UNION
+    SELECT pack_id FROM pack_theme WHERE name ILIKE $1
+)
+SELECT p.id, p.short_name, p.name, p.number_of_themes, p.version
+FROM pack p
+JOIN matches m ON m.pack_id = p.id
+WHERE p.short_name > $2
+ORDER BY p.short_name
+LIMIT $3;
@@ -1,6 +1,27 @@
--- Update pack file and number of themes
-UPDATE pack
-SET pack_file = $2, number_of_themes = $3
-WHERE short_name = $1
-RETURNING id;
-
+-- Rewrite a pack's meta and themes, bumping the content version
+-- $1: short_name
+-- $2: meta (JSONB) - pack_file without the themes list
+-- $3: themes (JSONB array)
+-- $4: number_of_themes
+WITH updated AS (
+    UPDATE pack
+    SET meta = $2,
+        number_of_themes = $4,
+        version = version + 1
+    WHERE short_name = $1
+    RETURNING id
+),
+upserted AS (
+    INSERT INTO pack_theme (pack_id, theme_index, content)
+    SELECT updated.id, t.ord - 1, t.theme
+    FROM updated
+    CROSS JOIN LATERAL jsonb_array_elements($3::JSONB) WITH ORDINALITY AS t(theme, ord)
+    ON CONFLICT (pack_id, theme_index) DO UPDATE SET content = EXCLUDED.content
+),
+removed AS (
+    DELETE FROM pack_theme pt
+    USING updated
+    WHERE pt.pack_id = updated.id
+      AND pt.theme_index >= jsonb_array_length($3::JSONB)
+)
+SELECT id FROM updated;
@@ -0,0 +1,46 @@
+-- Upsert a player and create missing statistics and rights rows in one round trip
+-- $1: telegram_id
+-- $2: username
+-- $3: first_name
+-- $4: last_name
+-- The player row is only written when it is new or its names changed.
+-- Returns the player record.
+WITH existing AS (
+    SELECT * FROM player WHERE telegram_id = $1::BIGINT
+),
+inserted AS (
+    INSERT INTO player (telegram_id, username, first_name, last_name)
+    SELECT $1::BIGINT, $2::VARCHAR, $3::VARCHAR, $4::VARCHAR
+    WHERE NOT EXISTS (SELECT 1 FROM existing)
+    ON CONFLICT (telegram_id) DO NOTHING
+    RETURNING *
+),
+updated AS (
+    UPDATE player
+    SET username = $2::VARCHAR,
+        first_name = $3::VARCHAR,
+        last_name = $4::VARCHAR
+    WHERE telegram_id = $1::BIGINT
+      AND (username, first_name, last_name) IS DISTINCT FROM ($2::VARCHAR, $3::VARCHAR, $4::VARCHAR)
+    RETURNING *
+),
+result AS (
+    SELECT * FROM inserted
+    UNION ALL
+    SELECT * FROM updated
+    UNION ALL
+    SELECT * FROM existing WHERE NOT EXISTS (SELECT 1 FROM updated)
+),
+new_statistics AS (
+    INSERT INTO statistics (user_id)
+    SELECT r.id FROM result r
+    WHERE NOT EXISTS (SELECT 1 FROM statistics s WHERE s.user_id = r.id)
+    ON CONFLICT (user_id) DO NOTHING
+),
+new_rights AS (
+    INSERT INTO player_rights (player_id)
+    SELECT r.id FROM result r
+    WHERE NOT EXISTS (SELECT 1 FROM player_rights pr WHERE pr.player_id = r.id)
+    ON CONFLICT (player_id) DO NOTHING
+)
+SELECT * FROM result;
@@ -1,6 +1,4 @@
 -- Get telegram_ids for a list of player UUIDs
-SELECT id, telegram_id, username, first_name, last_name
+SELECT id, telegram_id, username, first_name, last_name, created_at
 FROM player
 WHERE id = ANY($1);
-
-
@@ -0,0 +1,2 @@
+-- Get player statistics by player ID
+SELECT * FROM statistics WHERE user_id = $1;
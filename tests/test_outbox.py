@@ -0,0 +1,187 @@
+import asyncio
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+
+from game import game_loop
+from outbox import Outbox, Priority, TokenBucket
+
+GROUP_CHAT = -100
+PRIVATE_CHAT = 42
+
+
+def test_token_bucket_starts_full_and_refills():
+    bucket = TokenBucket(rate=2, capacity=3)
+    now = bucket.updated
+    
+    for _ in range(3):
+        assert bucket.delay(now) == 0
+        bucket.take(now)
+    
+    assert bucket.delay(now) == 0.5
+    assert bucket.delay(now + 0.5) == 0
+    assert not bucket.full(now + 1)
+    assert bucket.full(now + 1.5)
+
+
+def test_token_bucket_never_exceeds_capacity():
+    bucket = TokenBucket(rate=10, capacity=2)
+    bucket.take(bucket.updated)
+    later = bucket.updated + 100
+    bucket.delay(later)
+    assert bucket.tokens == 2
+
+
+def test_same_key_coalesces_into_latest_call():
+    async def scenario():
+        box = Outbox()
+        sent = []
+        
+        async def call(value):
+            sent.append(value)
+            return value
+        
+        first = box.submit(GROUP_CHAT, lambda: call("old"), Priority.GAME, key="question:1")
+        second = box.submit(GROUP_CHAT, lambda: call("new"), Priority.GAME, key="question:1")
+        return sent, await first, await second
+    
+    sent, first, second = asyncio.run(scenario())
+    assert sent == ["new"]
+    assert first == second == "new"
+
+
+def test_higher_priority_runs_first_and_fifo_within_priority():
+    async def scenario():
+        box = Outbox()
+        sent = []
+        
+        async def call(value):
+            sent.append(value)
+        
+        futures = [
+            box.submit(GROUP_CHAT, lambda: call("chatter"), Priority.CHATTER),
+            box.submit(GROUP_CHAT, lambda: call("game 1"), Priority.GAME),
+            box.submit(GROUP_CHAT, lambda: call("info"), Priority.INFO),
+            box.submit(GROUP_CHAT, lambda: call("game 2"), Priority.GAME),
+        ]
+        await asyncio.gather(*futures)
+        return sent
+    
+    assert asyncio.run(scenario()) == ["game 1", "game 2", "info", "chatter"]
+
+
+def test_cancel_drops_queued_call():
+    async def scenario():
+        box = Outbox()
+        sent = []
+        
+        async def call(value):
+            sent.append(value)
+        
+        future = box.submit(GROUP_CHAT, lambda: call("edit"), Priority.GAME, key="question:1")
+        assert box.cancel(GROUP_CHAT, "question:1")
+        assert not box.cancel(GROUP_CHAT, "question:1")
+        assert not box.cancel(PRIVATE_CHAT, "question:1")
+        await asyncio.sleep(0)
+        return sent, future
+    
+    sent, future = asyncio.run(scenario())
+    assert sent == []
+    assert future.cancelled()
+
+
+def test_cancel_reaches_call_waiting_for_rate_limit():
+    async def scenario():
+        box = Outbox()
+        sent = []
+        
+        async def call(value):
+            sent.append(value)
+        
+        # A private chat gets one call per second, so the edit has to wait
+        await box.submit(PRIVATE_CHAT, lambda: call("first"), Priority.GAME)
+        waiting = box.submit(PRIVATE_CHAT, lambda: call("edit"), Priority.GAME, key="question:1")
+        await asyncio.sleep(0.05)
+        assert box.cancel(PRIVATE_CHAT, "question:1")
+        await asyncio.sleep(0.05)
+        return sent, waiting
+    
+    sent, waiting = asyncio.run(scenario())
+    assert sent == ["first"]
+    assert waiting.cancelled()
+
+
+def test_budget_counts_queued_calls():
+    async def scenario():
+        box = Outbox()
+        fresh_group = box.budget(GROUP_CHAT)
+        fresh_private = box.budget(PRIVATE_CHAT)
+        
+        async def call():
+            return None
+        
+        box.submit(GROUP_CHAT, call, Priority.GAME)
+        box.submit(GROUP_CHAT, call, Priority.GAME)
+        queued = box.budget(GROUP_CHAT)
+        await asyncio.sleep(0.01)
+        sent = box.budget(GROUP_CHAT)
+        return fresh_group, fresh_private, queued, sent
+    
+    fresh_group, fresh_private, queued, sent = asyncio.run(scenario())
+    assert fresh_private == 1
+    assert queued == fresh_group - 2
+    assert fresh_group - 2 <= sent < fresh_group - 1.9
+
+
+def test_retry_after_requeues_the_call():
+    async def scenario():
+        box = Outbox()
+        attempts = []
+        
+        async def call():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise TelegramRetryAfter(method=None, message="Flood control", retry_after=0)
+            return "sent"
+        
+        return await box.submit(GROUP_CHAT, call, Priority.GAME), len(attempts)
+    
+    assert asyncio.run(scenario()) == ("sent", 2)
+
+
+def test_errors_reach_the_caller():
+    async def scenario():
+        box = Outbox()
+        
+        async def call():
+            raise ValueError("bad request")
+        
+        try:
+            await box.submit(GROUP_CHAT, call, Priority.GAME)
+        except ValueError as e:
+            return str(e)
+    
+    assert asyncio.run(scenario()) == "bad request"
+
+
+def test_answer_retry_is_a_separate_send(monkeypatch):
+    class Bot:
+        def __init__(self):
+            self.sends = []
+        
+        async def send_message(self, chat_id, text, **kwargs):
+            self.sends.append((text, kwargs.get('parse_mode')))
+            if kwargs.get('parse_mode') == "HTML":
+                raise TelegramBadRequest(method=None, message="can't parse entities")
+    
+    async def scenario():
+        box = Outbox()
+        monkeypatch.setattr(game_loop, "outbox", box)
+        bot = Bot()
+        game_loop.send_answer(bot, GROUP_CHAT, "42", "", None)
+        await asyncio.sleep(0.01)
+        return bot.sends, box.budget(GROUP_CHAT), box._new_bucket(GROUP_CHAT).capacity
+    
+    sends, budget, capacity = asyncio.run(scenario())
+    assert [mode for _, mode in sends] == ["HTML", None]
+    assert sends[1][0] == "Ответ: 42"
+    assert budget <= capacity - 2 + 0.1
@@ -0,0 +1,102 @@
+import asyncio
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+
+from database import packs
+from database.played_themes import PlayedThemesIndex
+
+PACK = uuid4()
+CATALOG = [{'id': PACK, 'short_name': 'p', 'name': 'Pack', 'number_of_themes': 8, 'version': 1}]
+
+
+@pytest.fixture
+def histories(monkeypatch):
+    calls: list[list] = []
+    rows: list[dict] = []
+    
+    async def get_player_pack_histories(player_ids):
+        calls.append(list(player_ids))
+        return [row for row in rows if row['player_id'] in player_ids]
+    
+    async def get_all_packs():
+        return [dict(pack) for pack in CATALOG]
+    
+    @asynccontextmanager
+    async def acquire():
+        raise AssertionError("the SQL fallback was used")
+        yield
+    
+    monkeypatch.setattr(packs, "_played_themes", PlayedThemesIndex(100, 600))
+    monkeypatch.setattr(packs, "get_player_pack_histories", get_player_pack_histories)
+    monkeypatch.setattr(packs, "get_all_packs", get_all_packs)
+    monkeypatch.setattr(packs.Database, "acquire", acquire)
+    return calls, rows
+
+
+def test_available_packs_load_histories_once(histories):
+    calls, rows = histories
+    first, second = uuid4(), uuid4()
+    rows.append({'player_id': first, 'pack_id': PACK, 'themes_mask': 0b11})
+    rows.append({'player_id': second, 'pack_id': PACK, 'themes_mask': 0b100})
+    
+    async def scenario():
+        before = await packs.get_available_packs_for_players([first, second], themes_needed=5)
+        again = await packs.get_available_packs_for_players([first, second], themes_needed=5)
+        return before, again
+    
+    before, again = asyncio.run(scenario())
+    assert calls == [[first, second]]
+    assert before == again
+    assert before[0].available_theme_indices == [3, 4, 5, 6, 7]
+
+
+def test_recorded_plays_reach_indexed_players(histories, monkeypatch):
+    calls, _ = histories
+    player = uuid4()
+    
+    @asynccontextmanager
+    async def acquire():
+        yield None
+    
+    async def execute(conn, name, *args):
+        return "INSERT 0 1"
+    
+    async def scenario():
+        await packs.get_available_packs_for_players([player], themes_needed=1)
+        monkeypatch.setattr(packs.Database, "acquire", acquire)
+        monkeypatch.setattr(packs.Database, "execute", execute)
+        await packs.update_player_pack_history(player, PACK, [0, 1])
+        return await packs.get_played_themes_mask(player, PACK)
+    
+    assert asyncio.run(scenario()) == 0b11
+    assert calls == [[player]]
+
+
+def test_failed_load_falls_back_to_sql(monkeypatch):
+    async def get_player_pack_histories(player_ids):
+        raise ConnectionError("database is down")
+    
+    fallback = []
+    
+    @asynccontextmanager
+    async def acquire():
+        yield None
+    
+    async def fetch(conn, name, *args):
+        fallback.append(name)
+        return []
+    
+    index = PlayedThemesIndex(100, 600)
+    monkeypatch.setattr(packs, "_played_themes", index)
+    monkeypatch.setattr(packs, "get_player_pack_histories", get_player_pack_histories)
+    monkeypatch.setattr(packs.Database, "acquire", acquire)
+    monkeypatch.setattr(packs.Database, "fetch", fetch)
+    
+    player = uuid4()
+    assert asyncio.run(packs.get_available_packs_for_players([player])) == []
+    assert fallback == ["packs/get_available_packs"]
+    # The aborted load does not keep collecting plays
+    index.merge(player, PACK, 1)
+    assert index.missing([player]) == [player]
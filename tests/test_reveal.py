@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+import outbox as outbox_module
+from game import reveal
+from game.reveal import QuestionReveal, question_key
+
+CHAT = -200
+MESSAGE = 7
+
+
+class FakeBot:
+    def __init__(self) -> None:
+        self.edits: list[str] = []
+    
+    async def edit_message_text(self, **kwargs) -> None:
+        self.edits.append(kwargs["text"])
+
+
+@pytest.fixture
+def box(monkeypatch):
+    box = outbox_module.Outbox()
+    monkeypatch.setattr(reveal, "outbox", box)
+    monkeypatch.setattr(reveal, "REVEAL_STEP_SECONDS", 0)
+    return box
+
+
+def render(part: int) -> str:
+    return f"part {part}"
+
+
+def test_reveals_every_part_with_budget(box):
+    async def scenario():
+        bot = FakeBot()
+        question = QuestionReveal(bot, CHAT, MESSAGE, render, total_parts=4)
+        await question.run()
+        await asyncio.sleep(0.01)
+        return bot, question
+    
+    bot, question = asyncio.run(scenario())
+    assert bot.edits[-1] == "part 3"
+    assert question.part_index == 3
+    assert question.edits + question.skipped == 3
+
+
+def test_skips_parts_but_always_sends_the_last(box, monkeypatch):
+    monkeypatch.setattr(box, "budget", lambda chat_id: 0)
+    
+    async def scenario():
+        bot = FakeBot()
+        question = QuestionReveal(bot, CHAT, MESSAGE, render, total_parts=4)
+        await question.run()
+        await asyncio.sleep(0.01)
+        return bot, question
+    
+    bot, question = asyncio.run(scenario())
+    assert bot.edits == ["part 3"]
+    assert question.edits == 1
+    assert question.skipped == 2
+
+
+def test_cancel_stops_reveal_and_drops_queued_edit(box, capsys):
+    async def scenario():
+        bot = FakeBot()
+        question = QuestionReveal(bot, CHAT, MESSAGE, render, total_parts=2)
+        # Hold the slot so the last edit stays queued
+        blocker = asyncio.Event()
+        box.submit(CHAT, blocker.wait, outbox_module.Priority.GAME)
+        await asyncio.sleep(0)
+        await question.run()
+        question.cancel()
+        blocker.set()
+        await asyncio.sleep(0.01)
+        return bot
+    
+    bot = asyncio.run(scenario())
+    assert bot.edits == []
+    assert not box.cancel(CHAT, question_key(MESSAGE))
+    assert "cancelled by a buzz" in capsys.readouterr().out
+
+
+def test_cancel_before_last_part_logs_once(box, capsys):
+    async def scenario():
+        question = QuestionReveal(FakeBot(), CHAT, MESSAGE, render, total_parts=3)
+        question.cancel()
+        question.cancel()
+        await question.run()
+        return question
+    
+    question = asyncio.run(scenario())
+    assert question.edits == 0
+    assert capsys.readouterr().out.count("[REVEAL]") == 1
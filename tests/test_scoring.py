@@ -0,0 +1,57 @@
+import asyncio
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+from database import games
+from game import scoring
+from game.types import AnswerState, GameSession
+
+
+def test_scoring_marks_the_question_done(monkeypatch):
+    player = uuid4()
+    applied = []
+    
+    async def get_players_by_telegram_ids(telegram_ids):
+        return {11: {'id': player}}
+    
+    async def apply_score_deltas(chat_id, deltas, position=None):
+        applied.append((chat_id, deltas, position))
+        return {}
+    
+    monkeypatch.setattr(scoring.players, "get_players_by_telegram_ids", get_players_by_telegram_ids)
+    monkeypatch.setattr(scoring.games, "apply_score_deltas", apply_score_deltas)
+    
+    session = GameSession.create(-400, 1, {}, [0, 1], [player])
+    session.current_theme_idx, session.current_question_idx = 1, 2
+    session.answered_players = {11: AnswerState.CORRECT}
+    asyncio.run(scoring.finalize_question_scores(session, 30, bot=None))
+    
+    assert applied == [(-400, {player: games.ScoreDelta(score=30, abs_score=30, correct=1)}, (1, 3))]
+
+
+def test_deltas_and_position_share_a_transaction(monkeypatch):
+    calls = []
+    
+    @asynccontextmanager
+    async def session(transaction=False):
+        calls.append(("transaction", transaction))
+        yield None
+    
+    async def fetch(conn, name, *args):
+        calls.append(name)
+        return []
+    
+    async def execute(conn, name, *args):
+        calls.append((name, args))
+        return "UPDATE 1"
+    
+    monkeypatch.setattr(games.Database, "session", session)
+    monkeypatch.setattr(games.Database, "fetch", fetch)
+    monkeypatch.setattr(games.Database, "execute", execute)
+    
+    asyncio.run(games.apply_score_deltas(-400, {uuid4(): games.ScoreDelta(score=10)}, position=(0, 4)))
+    assert calls == [
+        ("transaction", True),
+        "games/bulk_update_player_scores",
+        ("games/set_current_position", (-400, 0, 4)),
+    ]
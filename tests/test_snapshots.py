@@ -0,0 +1,139 @@
+import asyncio
+import zlib
+from uuid import uuid4
+
+import pytest
+
+from game import snapshots
+from game.snapshots import SNAPSHOT_VERSION, SnapshotWriter, apply_snapshot, encode_snapshot
+from game.types import GameSession
+
+
+def make_session(chat_id: int = -300) -> GameSession:
+    players = [uuid4(), uuid4()]
+    return GameSession.create(chat_id, 1, {}, [0, 1, 2], players)
+
+
+def played_session() -> GameSession:
+    session = make_session()
+    first, second = session.players
+    session.player_abs_scores = {first: 300, second: -100}
+    session.player_correct_answers = {11: 2}
+    session.player_wrong_answers = {22: 1}
+    session.player_pauses = {11: 1}
+    session.player_start_theme_idx = {first: 0, second: 2}
+    session.kicked_players = {33}
+    session.spectators = [uuid4()]
+    session.partial_display_enabled = True
+    return session
+
+
+def test_round_trip_restores_state_and_position():
+    saved = played_session()
+    snapshot = encode_snapshot(saved, (2, 3))
+    assert snapshot[0] == SNAPSHOT_VERSION
+    
+    restored = make_session()
+    assert apply_snapshot(restored, snapshot) == (2, 3)
+    assert restored.player_abs_scores == saved.player_abs_scores
+    assert restored.player_correct_answers == saved.player_correct_answers
+    assert restored.player_wrong_answers == saved.player_wrong_answers
+    assert restored.player_pauses == saved.player_pauses
+    assert restored.player_start_theme_idx == saved.player_start_theme_idx
+    assert restored.kicked_players == saved.kicked_players
+    assert restored.spectators == saved.spectators
+    assert restored.partial_display_enabled is True
+
+
+def test_round_trip_of_fresh_session():
+    restored = make_session()
+    assert apply_snapshot(restored, encode_snapshot(make_session(), (0, 0))) == (0, 0)
+    assert restored.kicked_players is None
+    assert restored.spectators == []
+    assert restored.player_abs_scores == {}
+
+
+def test_dispatches_on_version_byte(monkeypatch):
+    seen = []
+    
+    def read_v2(session, state):
+        seen.append(state)
+        return state['at'], 0
+    
+    monkeypatch.setitem(snapshots._READERS, 2, read_v2)
+    snapshot = bytes([2]) + zlib.compress(b'{"at":4}')
+    assert apply_snapshot(make_session(), snapshot) == (4, 0)
+    assert seen == [{'at': 4}]
+
+
+@pytest.mark.parametrize("snapshot", [
+    b"",
+    bytes([255]) + zlib.compress(b"{}"),
+    bytes([SNAPSHOT_VERSION]) + b"not zlib",
+    bytes([SNAPSHOT_VERSION]) + zlib.compress(b"not json"),
+    bytes([SNAPSHOT_VERSION]) + zlib.compress(b'{"pos":[0,0]}'),
+])
+def test_unreadable_snapshot_is_ignored(snapshot):
+    session = make_session()
+    assert apply_snapshot(session, snapshot) is None
+    assert session.player_abs_scores == {}
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    writes: list[tuple[int, tuple[int, int]]] = []
+    
+    async def set_session_snapshot(chat_id, snapshot):
+        await asyncio.sleep(0)
+        writes.append((chat_id, apply_snapshot(make_session(), snapshot)))
+    
+    monkeypatch.setattr(snapshots.games, "set_session_snapshot", set_session_snapshot)
+    return writes
+
+
+def test_writer_collapses_saves_into_latest(writes):
+    async def scenario():
+        writer = SnapshotWriter()
+        session = make_session()
+        writer.save(session, 0, 1)
+        await asyncio.sleep(0)
+        # The first write is in flight; these collapse into one more write
+        writer.save(session, 0, 2)
+        writer.save(session, 0, 3)
+        writer.save(session, 1, 0)
+        await writer.flush_all()
+    
+    asyncio.run(scenario())
+    assert writes == [(-300, (0, 1)), (-300, (1, 0))]
+
+
+def test_writer_discard_drops_pending_snapshot(writes):
+    async def scenario():
+        writer = SnapshotWriter()
+        session = make_session()
+        writer.save(session, 0, 1)
+        writer.discard(session.game_chat_id)
+        await writer.flush_all()
+    
+    asyncio.run(scenario())
+    assert writes == []
+
+
+def test_writer_survives_failed_write(monkeypatch):
+    attempts = []
+    
+    async def set_session_snapshot(chat_id, snapshot):
+        attempts.append(chat_id)
+        raise ConnectionError("database is down")
+    
+    monkeypatch.setattr(snapshots.games, "set_session_snapshot", set_session_snapshot)
+    
+    async def scenario():
+        writer = SnapshotWriter()
+        writer.save(make_session(), 0, 1)
+        await writer.flush_all()
+        writer.save(make_session(), 0, 2)
+        await writer.flush_all()
+    
+    asyncio.run(scenario())
+    assert attempts == [-300, -300]
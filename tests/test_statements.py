@@ -0,0 +1,75 @@
+import asyncio
+
+import asyncpg
+import pytest
+
+from database.connection import Database
+from database.statements import StatementRegistry
+
+
+class FakeStatement:
+    def __init__(self, result, stale: bool = False) -> None:
+        self.result = result
+        self.stale = stale
+    
+    async def fetch(self, *args):
+        if self.stale:
+            raise asyncpg.InvalidCachedStatementError("cached statement plan is invalid")
+        return self.result
+
+
+class FakeConnection:
+    def __init__(self, in_transaction: bool = False) -> None:
+        self.in_transaction = in_transaction
+        self.prepares: list[str] = []
+        self.results = iter(["stale", "fresh"])
+    
+    def get_server_pid(self) -> int:
+        return 1234
+    
+    def is_in_transaction(self) -> bool:
+        return self.in_transaction
+    
+    def add_termination_listener(self, callback) -> None:
+        pass
+    
+    async def prepare(self, sql: str) -> FakeStatement:
+        self.prepares.append(sql)
+        result = next(self.results)
+        return FakeStatement(result, stale=result == "stale")
+
+
+@pytest.fixture
+def registry(monkeypatch, tmp_path):
+    (tmp_path / "things").mkdir()
+    (tmp_path / "things" / "get_things.sql").write_text("SELECT 1")
+    registry = StatementRegistry(tmp_path)
+    registry.load()
+    monkeypatch.setattr(Database, "_statements", registry)
+    return registry
+
+
+def test_stale_statement_is_prepared_again(registry):
+    conn = FakeConnection()
+    
+    async def scenario():
+        await registry.prepare_all(conn)
+        first = await Database.fetch(conn, "things/get_things")
+        second = await Database.fetch(conn, "things/get_things")
+        return first, second
+    
+    assert asyncio.run(scenario()) == ("fresh", "fresh")
+    assert len(conn.prepares) == 2
+    assert registry.stats()["things/get_things"].prepared == 2
+
+
+def test_stale_statement_in_transaction_is_raised(registry):
+    conn = FakeConnection(in_transaction=True)
+    
+    async def scenario():
+        await registry.prepare_all(conn)
+        await Database.fetch(conn, "things/get_things")
+    
+    with pytest.raises(asyncpg.InvalidCachedStatementError):
+        asyncio.run(scenario())
+    assert len(conn.prepares) == 1